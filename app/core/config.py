@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 try:
     from dotenv import load_dotenv
@@ -12,70 +14,145 @@ if load_dotenv:
     load_dotenv(env_path)
 
 
+def _parse_int(raw: str | None, default: int) -> int:
+    return int(raw) if raw else default
+
+
+def _parse_float(raw: str | None, default: float) -> float:
+    return float(raw) if raw else default
+
+
+def _parse_bool(raw: str | None, default: bool) -> bool:
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _parse_enum(raw: str | None, allowed: frozenset[str], default: str) -> str:
+    value = (raw or "").strip().lower()
+    return value if value in allowed else default
+
+
 class Settings:
-    app_name = "edu_cockpit"
-
-    db_host = os.getenv("DB_HOST", "127.0.0.1")
-    db_port = int(os.getenv("DB_PORT", "3306"))
-    db_user = os.getenv("DB_USER", "root")
-    db_password = os.getenv("DB_PASSWORD", "")
-    db_name = os.getenv("DB_NAME", "edu_admin")
-
-    jwt_secret = os.getenv("JWT_SECRET", "sane")
-    jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
-    access_token_expire_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
-
-    llm_provider = os.getenv("LLM_PROVIDER", "dashcope")
-    llm_api_key = os.getenv("LLM_API_KEY", "")
-    llm_base_url = os.getenv("LLM_BASE_URL", "")
-    llm_model_intent = os.getenv("LLM_MODEL_INTENT", "qwen-plus")
-    llm_model_sql_generation = os.getenv("LLM_MODEL_SQL_GENERATION", "qwen3-coder-plus")
-    _raw_llm_response_format_sql = os.getenv("LLM_RESPONSE_FORMAT_SQL", "").strip().lower()
-    llm_response_format_sql = _raw_llm_response_format_sql if _raw_llm_response_format_sql in {"json_object"} else ""
-    intent_confidence_threshold = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.7"))
-    node_io_log_dir = os.getenv("NODE_IO_LOG_DIR", "local_logs/node_io")
-    chat_export_dir = os.getenv("CHAT_EXPORT_DIR", "local_logs/chat_exports")
-    _raw_chat_stream_mode = os.getenv("CHAT_STREAM_MODE", "stream").strip().lower()
-    chat_stream_mode = _raw_chat_stream_mode if _raw_chat_stream_mode in {"stream", "sync"} else "stream"
-    chat_stream_workflow_start_message = "收到！让我帮您查一查"
-    chat_stream_workflow_end_message = "搞定啦，结果在这儿"
-    chat_stream_step_message_placeholders = {
-        "intent_recognition": {
-            "start": "让我先想想您想问什么",
-            "end": "懂了！"
-        },
-        "task_parse": {
-            "start": "拆解一下问题结构",
-            "end": "思路清晰了"
-        },
-        "sql_generation": {
-            "start": "开始拼装查询语句",
-            "end": "语句组装完成"
-        },
-        "sql_validate": {
-            "start": "再帮您检查一遍",
-            "end": "看起来没问题"
-        },
-        "hidden_context": {
-            "start": "看样子SQL生成有误，别慌，我会救场！",
-            "end": "救场完毕！重新生成试试！"
-        },
-        "result_return": {
-            "start": "整理一下结果给您",
-            "end": "整理好咯"
-        },
-    }
-
-    @property
-    def database_url(self) -> str:
-        return (
-            f"mysql+pymysql://{self.db_user}:{self.db_password}"
+    # 固定槽位：省去实例 __dict__，属性访问走 C 层槽描述符。
+    __slots__ = (
+        "app_name",
+        "debug",
+        "db_host",
+        "db_port",
+        "db_user",
+        "db_password",
+        "db_name",
+        "db_driver",
+        "db_pool_size",
+        "db_max_overflow",
+        "db_pool_recycle",
+        "db_query_cache_size",
+        "jwt_secret",
+        "jwt_algorithm",
+        "access_token_expire_minutes",
+        "llm_provider",
+        "llm_api_key",
+        "llm_base_url",
+        "llm_model_intent",
+        "llm_model_sql_generation",
+        "llm_response_format_sql",
+        "llm_max_concurrency",
+        "intent_confidence_threshold",
+        "node_io_log_dir",
+        "chat_export_dir",
+        "chat_stream_mode",
+        "chat_stream_workflow_start_message",
+        "chat_stream_workflow_end_message",
+        "chat_stream_step_message_placeholders",
+        "database_url",
+        "access_token_expires",
+    )
+
+    def __init__(self) -> None:
+        # 绑定一次 os.environ.get，后续全部走局部名字查找。
+        env = os.environ.get
+
+        self.app_name = "edu_cockpit"
+        # 调试开关：控制工作流节点输出是否打印到控制台，生产默认关闭。
+        self.debug = _parse_bool(env("APP_DEBUG"), False)
+
+        self.db_host = env("DB_HOST", "127.0.0.1")
+        self.db_port = _parse_int(env("DB_PORT"), 3306)
+        self.db_user = env("DB_USER", "root")
+        self.db_password = env("DB_PASSWORD", "")
+        self.db_name = env("DB_NAME", "edu_admin")
+        # 驱动可切换：装有 mysqlclient 时设 DB_DRIVER=mysqldb 走 C 实现解码，行解析快于纯 Python 的 pymysql。
+        self.db_driver = env("DB_DRIVER", "pymysql")
+        self.db_pool_size = _parse_int(env("DB_POOL_SIZE"), 20)
+        self.db_max_overflow = _parse_int(env("DB_MAX_OVERFLOW"), 10)
+        self.db_pool_recycle = _parse_int(env("DB_POOL_RECYCLE"), 1800)
+        self.db_query_cache_size = _parse_int(env("DB_QUERY_CACHE_SIZE"), 1200)
+
+        self.jwt_secret = env("JWT_SECRET", "sane")
+        self.jwt_algorithm = env("JWT_ALGORITHM", "HS256")
+        self.access_token_expire_minutes = _parse_int(env("ACCESS_TOKEN_EXPIRE_MINUTES"), 120)
+
+        self.llm_provider = env("LLM_PROVIDER", "dashcope")
+        self.llm_api_key = env("LLM_API_KEY", "")
+        self.llm_base_url = env("LLM_BASE_URL", "")
+        self.llm_model_intent = env("LLM_MODEL_INTENT", "qwen-plus")
+        self.llm_model_sql_generation = env("LLM_MODEL_SQL_GENERATION", "qwen3-coder-plus")
+        self.llm_response_format_sql = _parse_enum(
+            env("LLM_RESPONSE_FORMAT_SQL"), frozenset({"json_object"}), ""
+        )
+        # LLM 并发上限：对齐服务商限流配置，超出的调用在工作线程上排队等闸。
+        self.llm_max_concurrency = _parse_int(env("LLM_MAX_CONCURRENCY"), 8)
+        self.intent_confidence_threshold = _parse_float(env("INTENT_CONFIDENCE_THRESHOLD"), 0.7)
+        self.node_io_log_dir = env("NODE_IO_LOG_DIR", "local_logs/node_io")
+        self.chat_export_dir = env("CHAT_EXPORT_DIR", "local_logs/chat_exports")
+        self.chat_stream_mode = _parse_enum(env("CHAT_STREAM_MODE"), frozenset({"stream", "sync"}), "stream")
+        self.chat_stream_workflow_start_message = "收到！让我帮您查一查"
+        self.chat_stream_workflow_end_message = "搞定啦，结果在这儿"
+        # 只读映射：占位文案被流式回调高频读取，冻结后杜绝跨请求的意外改写。
+        self.chat_stream_step_message_placeholders = MappingProxyType({
+            "intent_recognition": MappingProxyType({
+                "start": "让我先想想您想问什么",
+                "end": "懂了！"
+            }),
+            "task_parse": MappingProxyType({
+                "start": "拆解一下问题结构",
+                "end": "思路清晰了"
+            }),
+            "sql_generation": MappingProxyType({
+                "start": "开始拼装查询语句",
+                "end": "语句组装完成"
+            }),
+            "sql_validate": MappingProxyType({
+                "start": "再帮您检查一遍",
+                "end": "看起来没问题"
+            }),
+            "hidden_context": MappingProxyType({
+                "start": "看样子SQL生成有误，别慌，我会救场！",
+                "end": "救场完毕！重新生成试试！"
+            }),
+            "result_return": MappingProxyType({
+                "start": "整理一下结果给您",
+                "end": "整理好咯"
+            }),
+        })
+
+        # 派生配置在构造时算好，避免每次属性访问重复拼接/重建对象。
+        self.database_url = (
+            f"mysql+{self.db_driver}://{self.db_user}:{self.db_password}"
             f"@{self.db_host}:{self.db_port}/{self.db_name}?charset=utf8mb4"
         )
+        self.access_token_expires = timedelta(minutes=self.access_token_expire_minutes)
+
 
-    @property
-    def access_token_expires(self) -> timedelta:
-        return timedelta(minutes=self.access_token_expire_minutes)
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    作用：返回进程内唯一的 Settings 实例，环境变量只在首次调用时解析。
+    输出参数：
+    - Settings: 配置单例。
+    """
+    return Settings()
 
 
-settings = Settings()
+settings = get_settings()
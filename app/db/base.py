@@ -1,3 +1,21 @@
-﻿from sqlalchemy.orm import declarative_base
+from sqlalchemy import Boolean, DateTime, Integer
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+from sqlalchemy.sql import func
 
 Base = declarative_base()
+
+
+class AuditBase(Base):
+    """带审计字段的抽象基类：审计列只声明一次，各业务表直接继承。"""
+
+    __abstract__ = True
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now(), comment="创建时间"
+    )
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now(), comment="更新时间"
+    )
+    created_by: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="创建人")
+    updated_by: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="更新人")
+    is_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, comment="逻辑删除")
@@ -1,7 +1,28 @@
-﻿from sqlalchemy import create_engine
+﻿from functools import lru_cache
+
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@lru_cache(maxsize=1)
+def get_engine():
+    """
+    作用：返回进程内唯一的数据库引擎，连接池与编译缓存只初始化一次。
+    输出参数：
+    - Engine: 全局共享的 SQLAlchemy 引擎。
+    """
+    return create_engine(
+        settings.database_url,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        query_cache_size=settings.db_query_cache_size,
+    )
+
+
+engine = get_engine()
+# expire_on_commit=False：提交后对象属性保持可用，写接口不必整行重查。
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
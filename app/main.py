@@ -1,16 +1,44 @@
-﻿import uvicorn
+﻿from contextlib import asynccontextmanager
+
+import uvicorn
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
 
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.routers import admin, auth, chat, data, importer, metric, cockpit
 from app.schemas.response import ErrorResponse
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 同步路由跑在 AnyIO 线程池里，默认 40 个令牌会卡住 DB 等待型负载的并发上限；
+    # 按连接池容量的两倍放大，让等待 DB 的线程不挤占其余同步请求。
+    to_thread.current_default_thread_limiter().total_tokens = 2 * (
+        settings.db_pool_size + settings.db_max_overflow
+    )
+
+    # 启动时完成 mapper 配置并预热连接池，避免首个请求承担这部分一次性开销。
+    from app import models  # noqa: F401
+
+    configure_mappers()
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        # 数据库暂不可用时不阻塞启动，/healthz 会如实上报。
+        pass
+    finally:
+        db.close()
+    yield
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="Edu Cockpit API", version="1.0.0")
+    app = FastAPI(title="Edu Cockpit API", version="1.0.0", lifespan=lifespan)
 
     app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
     app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
@@ -14,7 +14,6 @@ from app.models.import_log import ImportLog
 from app.models.major import Major
 from app.models.metric_def import MetricDef
 from app.models.metric_snapshot import MetricSnapshot
-from app.models.mixins import AuditMixin
 from app.models.query_template import QueryTemplate
 from app.models.score import Score
 from app.models.sql_log import SqlLog
@@ -31,7 +30,6 @@ __all__ = [
     "Attendance",
     "AuditLog",
     "ChatHistory",
-    "AuditMixin",
     "ClassModel",
     "Classroom",
     "College",
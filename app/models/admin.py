@@ -1,12 +1,13 @@
-﻿from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy import DateTime, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import AuditBase
 
 
-class Admin(Base):
+class Admin(AuditBase):
     __tablename__ = "admin"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_admin_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
     username: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True, comment="账号")
@@ -16,13 +17,3 @@ class Admin(Base):
     email: Mapped[str | None] = mapped_column(String(128), nullable=True, comment="邮箱")
     last_login_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True, comment="最后登录时间")
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="active", comment="状态")
-
-    created_at: Mapped[DateTime] = mapped_column(
-        DateTime, nullable=False, server_default=func.now(), comment="创建时间"
-    )
-    updated_at: Mapped[DateTime] = mapped_column(
-        DateTime, nullable=False, server_default=func.now(), onupdate=func.now(), comment="更新时间"
-    )
-    created_by: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="创建人")
-    updated_by: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="更新人")
-    is_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, comment="逻辑删除")
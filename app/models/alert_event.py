@@ -1,11 +1,10 @@
 from sqlalchemy import DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class AlertEvent(AuditMixin, Base):
+class AlertEvent(AuditBase):
     __tablename__ = "alert_event"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
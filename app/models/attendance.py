@@ -1,11 +1,10 @@
 from sqlalchemy import Date, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Attendance(AuditMixin, Base):
+class Attendance(AuditBase):
     __tablename__ = "attendance"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
@@ -1,11 +1,10 @@
 from sqlalchemy import Integer, JSON, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class AuditLog(AuditMixin, Base):
+class AuditLog(AuditBase):
     __tablename__ = "audit_log"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
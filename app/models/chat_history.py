@@ -1,12 +1,22 @@
-from sqlalchemy import Integer, String, Text
+from sqlalchemy import Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class ChatHistory(AuditMixin, Base):
+class ChatHistory(AuditBase):
     __tablename__ = "chat_history"
+    # 组合索引：会话历史按 (会话, 角色, 删除标记) 过滤并按时间倒序取最近几条，让整段扫描走索引。
+    __table_args__ = (
+        Index(
+            "ix_chat_history_session_role_deleted_created_id",
+            "session_id",
+            "message_role",
+            "is_deleted",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
     admin_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True, comment="管理员ID")
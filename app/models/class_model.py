@@ -1,15 +1,16 @@
-﻿from sqlalchemy import ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class ClassModel(AuditMixin, Base):
+class ClassModel(AuditBase):
     __tablename__ = "class"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_class_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
-    class_name: Mapped[str] = mapped_column(String(128), nullable=False, comment="班级名称")
+    class_name: Mapped[str] = mapped_column(String(128), nullable=False, index=True, comment="班级名称")
     class_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="班级编码")
     major_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("major.id"), nullable=False, index=True, comment="所属专业ID"
@@ -18,4 +19,10 @@ class ClassModel(AuditMixin, Base):
     head_teacher_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("teacher.id"), nullable=True, index=True, comment="教师ID"
     )
-    student_count: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="班级人数")
\ No newline at end of file
+    student_count: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="班级人数")
+
+    # lazy="raise"：禁止隐式懒加载，调用方必须在查询时显式选择 joinedload/selectinload，避免 N+1。
+    major: Mapped["Major"] = relationship("Major", back_populates="classes", lazy="raise")
+    students: Mapped[list["Student"]] = relationship(
+        "Student", back_populates="class_info", lazy="raise"
+    )
\ No newline at end of file
@@ -1,11 +1,10 @@
 from sqlalchemy import Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Classroom(AuditMixin, Base):
+class Classroom(AuditBase):
     __tablename__ = "classroom"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
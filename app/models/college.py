@@ -1,14 +1,24 @@
-﻿from sqlalchemy import Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class College(AuditMixin, Base):
+class College(AuditBase):
     __tablename__ = "college"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_college_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
-    college_name: Mapped[str] = mapped_column(String(128), nullable=False, comment="学院名称")
+    college_name: Mapped[str] = mapped_column(String(128), nullable=False, index=True, comment="学院名称")
     college_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="学院编码")
-    description: Mapped[str | None] = mapped_column(Text, nullable=True, comment="描述")
\ No newline at end of file
+    # TEXT 列仅详情场景使用，延迟加载以减小列表查询的行负载。
+    description: Mapped[str | None] = mapped_column(
+        Text, nullable=True, deferred=True, deferred_group="detail", comment="描述"
+    )
+
+    # lazy="raise"：禁止隐式懒加载，调用方必须在查询时显式选择 joinedload/selectinload，避免 N+1。
+    majors: Mapped[list["Major"]] = relationship("Major", back_populates="college", lazy="raise")
+    students: Mapped[list["Student"]] = relationship(
+        "Student", back_populates="college", lazy="raise"
+    )
\ No newline at end of file
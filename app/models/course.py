@@ -1,15 +1,16 @@
-﻿from sqlalchemy import Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Course(AuditMixin, Base):
+class Course(AuditBase):
     __tablename__ = "course"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_course_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
-    course_name: Mapped[str] = mapped_column(String(128), nullable=False, comment="课程名称")
+    course_name: Mapped[str] = mapped_column(String(128), nullable=False, index=True, comment="课程名称")
     course_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="课程编码")
     credit: Mapped[float | None] = mapped_column(Float, nullable=True, comment="学分")
     hours: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="学时")
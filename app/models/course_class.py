@@ -1,11 +1,10 @@
 from sqlalchemy import ForeignKey, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class CourseClass(AuditMixin, Base):
+class CourseClass(AuditBase):
     __tablename__ = "course_class"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
@@ -2,11 +2,10 @@ from sqlalchemy import DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Enroll(AuditMixin, Base):
+class Enroll(AuditBase):
     __tablename__ = "enroll"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
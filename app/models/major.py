@@ -1,18 +1,31 @@
-﻿from sqlalchemy import ForeignKey, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Major(AuditMixin, Base):
+class Major(AuditBase):
     __tablename__ = "major"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_major_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
-    major_name: Mapped[str] = mapped_column(String(128), nullable=False, comment="专业名称")
+    major_name: Mapped[str] = mapped_column(String(128), nullable=False, index=True, comment="专业名称")
     major_code: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="专业编码")
     college_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("college.id"), nullable=False, index=True, comment="所属学院ID"
     )
     degree_type: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="学历类型")
-    description: Mapped[str | None] = mapped_column(Text, nullable=True, comment="描述")
+    # TEXT 列仅详情场景使用，延迟加载以减小列表查询的行负载。
+    description: Mapped[str | None] = mapped_column(
+        Text, nullable=True, deferred=True, deferred_group="detail", comment="描述"
+    )
+
+    # lazy="raise"：禁止隐式懒加载，调用方必须在查询时显式选择 joinedload/selectinload，避免 N+1。
+    college: Mapped["College"] = relationship("College", back_populates="majors", lazy="raise")
+    classes: Mapped[list["ClassModel"]] = relationship(
+        "ClassModel", back_populates="major", lazy="raise"
+    )
+    students: Mapped[list["Student"]] = relationship(
+        "Student", back_populates="major", lazy="raise"
+    )
@@ -1,11 +1,10 @@
 from sqlalchemy import DateTime, Float, Integer, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class MetricSnapshot(AuditMixin, Base):
+class MetricSnapshot(AuditBase):
     __tablename__ = "metric_snapshot"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
@@ -1,11 +1,10 @@
 from sqlalchemy import Float, ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Score(AuditMixin, Base):
+class Score(AuditBase):
     __tablename__ = "score"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
@@ -21,3 +20,6 @@ class Score(AuditMixin, Base):
     term: Mapped[str] = mapped_column(String(32), nullable=False, index=True, comment="学期")
     score_value: Mapped[float | None] = mapped_column(Float, nullable=True, comment="成绩")
     score_level: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="成绩等级")
+
+    # lazy="raise"：禁止隐式懒加载，调用方必须在查询时显式选择 joinedload/selectinload，避免 N+1。
+    course: Mapped["Course"] = relationship("Course", lazy="raise")
@@ -1,30 +1,49 @@
-﻿from sqlalchemy import Date, ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Student(AuditMixin, Base):
+class Student(AuditBase):
     __tablename__ = "student"
+    # 组合索引对齐常见统计问法（按学院/专业+入学年份聚合、按专业+年份+性别过滤），
+    # 单列 college_id/major_id 索引是组合索引前缀，不再单独建。
+    __table_args__ = (
+        Index("ix_student_college_major_year", "college_id", "major_id", "enroll_year"),
+        Index("ix_student_major_year_gender", "major_id", "enroll_year", "gender"),
+        # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+        Index("ix_student_is_deleted_id", "is_deleted", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
     student_no: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="学号")
-    real_name: Mapped[str] = mapped_column(String(64), nullable=False, comment="姓名")
+    real_name: Mapped[str] = mapped_column(String(64), nullable=False, index=True, comment="姓名")
     gender: Mapped[str | None] = mapped_column(String(16), nullable=True, comment="性别")
-    id_card: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="身份证号")
+    id_card: Mapped[str | None] = mapped_column(
+        String(32), nullable=True, deferred=True, deferred_group="detail", comment="身份证号"
+    )
     birth_date: Mapped[Date | None] = mapped_column(Date, nullable=True, comment="出生日期")
     phone: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="手机号")
     email: Mapped[str | None] = mapped_column(String(128), nullable=True, comment="邮箱")
-    address: Mapped[str | None] = mapped_column(String(255), nullable=True, comment="家庭住址")
+    # 宽列仅详情场景使用，延迟加载以减小列表/聚合查询的行负载。
+    address: Mapped[str | None] = mapped_column(
+        String(255), nullable=True, deferred=True, deferred_group="detail", comment="家庭住址"
+    )
     class_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("class.id"), nullable=True, index=True, comment="所属班级ID"
     )
     major_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("major.id"), nullable=True, index=True, comment="所属专业ID"
+        Integer, ForeignKey("major.id"), nullable=True, comment="所属专业ID"
     )
     college_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("college.id"), nullable=True, index=True, comment="所属学院ID"
+        Integer, ForeignKey("college.id"), nullable=True, comment="所属学院ID"
     )
     enroll_year: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="入学年份")
-    status: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="学籍状态")
\ No newline at end of file
+    status: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="学籍状态")
+
+    # lazy="raise"：禁止隐式懒加载，调用方必须在查询时显式选择 joinedload/selectinload，避免 N+1。
+    class_info: Mapped["ClassModel | None"] = relationship(
+        "ClassModel", back_populates="students", lazy="raise"
+    )
+    major: Mapped["Major | None"] = relationship("Major", back_populates="students", lazy="raise")
+    college: Mapped["College | None"] = relationship("College", back_populates="students", lazy="raise")
\ No newline at end of file
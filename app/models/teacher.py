@@ -1,16 +1,17 @@
-﻿from sqlalchemy import Date, ForeignKey, Integer, String
+from sqlalchemy import Date, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
-from app.models.mixins import AuditMixin
+from app.db.base import AuditBase
 
 
-class Teacher(AuditMixin, Base):
+class Teacher(AuditBase):
     __tablename__ = "teacher"
+    # 组合索引 (is_deleted, id)：列表默认按删除标记过滤并带窗口计数，让扫描走索引而非全表。
+    __table_args__ = (Index("ix_teacher_is_deleted_id", "is_deleted", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, comment="主键")
     teacher_no: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True, comment="工号")
-    real_name: Mapped[str] = mapped_column(String(64), nullable=False, comment="姓名")
+    real_name: Mapped[str] = mapped_column(String(64), nullable=False, index=True, comment="姓名")
     gender: Mapped[str | None] = mapped_column(String(16), nullable=True, comment="性别")
     id_card: Mapped[str | None] = mapped_column(String(32), nullable=True, comment="身份证号")
     birth_date: Mapped[Date | None] = mapped_column(Date, nullable=True, comment="出生日期")
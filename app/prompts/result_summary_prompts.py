@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import json
 from typing import Any
 
+import orjson
+
 RESULT_SUMMARY_SYSTEM_PROMPT = """
 你是教务查询结果总结助手。
 请根据输入的用户问题与查询结果，生成简洁、准确、可直接展示给用户的总结。
@@ -18,6 +19,12 @@ RESULT_SUMMARY_SYSTEM_PROMPT = """
 7) 若输入包含 field_display_hints，summary 引用字段时优先使用其中的中文展示名，不要直接输出 table.field 或 snake_case 技术字段名。
 """.strip()
 
+# 系统提示词的 UTF-8 字节在导入时编码一次，供直接收 bytes 的 HTTP 客户端复用。
+RESULT_SUMMARY_SYSTEM_PROMPT_BYTES = RESULT_SUMMARY_SYSTEM_PROMPT.encode("utf-8")
+
+# output_schema 固定不变，提前序列化成字节，避免每次请求重复编码。
+_OUTPUT_SCHEMA_BYTES = orjson.dumps({"summary": "string"})
+
 
 def build_result_summary_user_prompt(
     user_query: str,
@@ -38,8 +45,6 @@ def build_result_summary_user_prompt(
         "sql_validate_result": sql_validate_result,
         "hidden_context_retry_count": hidden_context_retry_count,
         "field_display_hints": field_display_hints or {},
-        "output_schema": {
-            "summary": "string",
-        },
     }
-    return json.dumps(payload, ensure_ascii=False)
+    body = orjson.dumps(payload)
+    return (body[:-1] + b',"output_schema":' + _OUTPUT_SCHEMA_BYTES + b"}").decode("utf-8")
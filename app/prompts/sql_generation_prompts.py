@@ -153,21 +153,31 @@ def _helper_build_retry_constraints(hidden_context: dict[str, Any] | None) -> di
     return constraints
 
 
-def build_sql_generation_user_prompt(
-    rewritten_query: str,
-    task: dict[str, Any],
+def build_sql_generation_system_prompt(
     field_whitelist: list[str],
     alias_pairs: list[dict[str, list[str]]],
     schema_hints: list[dict[str, Any]],
+) -> str:
+    """作用：拼接系统提示词与 KB 提示。两者跨请求不变，置于消息前缀可命中服务商的前缀缓存。"""
+    kb_payload: dict[str, Any] = {
+        "kb_field_whitelist": list(field_whitelist),
+        "alias_hints": list(alias_pairs),
+        "kb_schema_hints": list(schema_hints),
+    }
+    # sort_keys：键序固定，多进程间前缀字节一致，缓存命中不受字典插入序影响。
+    kb_body = json.dumps(kb_payload, ensure_ascii=False, sort_keys=True)
+    return f"{SQL_GENERATION_SYSTEM_PROMPT}\n\n知识库提示（kb_field_whitelist、alias_hints 与 kb_schema_hints）：\n{kb_body}"
+
+
+def build_sql_generation_user_prompt(
+    rewritten_query: str,
+    task: dict[str, Any],
     hidden_context: dict[str, Any] | None = None,
 ) -> str:
     retry_constraints = _helper_build_retry_constraints(hidden_context)
     payload: dict[str, Any] = {
         "rewritten_query": rewritten_query,
         "task": task,
-        "kb_field_whitelist": field_whitelist,
-        "alias_hints": alias_pairs,
-        "kb_schema_hints": schema_hints,
         "hidden_context": hidden_context,
         "retry_constraints": retry_constraints,
         "output_schema": {
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import json
 from typing import Any
 
+import orjson
+
 TASK_PARSE_SYSTEM_PROMPT = """
 你是教务查询任务解析助手。
 请将用户问题解析为结构化任务对象，供后续 SQL 生成阶段使用。
@@ -50,25 +51,39 @@ TASK_PARSE_SYSTEM_PROMPT = """
 }
 """.strip()
 
+# 系统提示词的 UTF-8 字节在导入时编码一次，供直接收 bytes 的 HTTP 客户端复用。
+TASK_PARSE_SYSTEM_PROMPT_BYTES = TASK_PARSE_SYSTEM_PROMPT.encode("utf-8")
+
+# output_schema 固定不变，提前序列化成字节，避免每次请求重复编码。
+_OUTPUT_SCHEMA_BYTES = orjson.dumps(
+    {
+        "intent": "chat|business_query",
+        "entities": [{"type": "string", "value": "string"}],
+        "dimensions": ["string"],
+        "metrics": ["string"],
+        "filters": [{"field": "table.field", "op": "=", "value": "string|number|boolean"}],
+        "time_range": {"start": "YYYY-MM-DD|null", "end": "YYYY-MM-DD|null"},
+        "operation": "detail|aggregate|ranking|trend",
+        "confidence": "0~1",
+    }
+)
+
 
-def build_task_parse_user_prompt(
-    query: str,
+def build_task_parse_system_prompt(
     field_whitelist: list[str],
     alias_pairs: list[dict[str, list[str]]],
 ) -> str:
-    payload: dict[str, Any] = {
-        "query": query,
-        "kb_field_whitelist": field_whitelist,
-        "alias_hints": alias_pairs,
-        "output_schema": {
-            "intent": "chat|business_query",
-            "entities": [{"type": "string", "value": "string"}],
-            "dimensions": ["string"],
-            "metrics": ["string"],
-            "filters": [{"field": "table.field", "op": "=", "value": "string|number|boolean"}],
-            "time_range": {"start": "YYYY-MM-DD|null", "end": "YYYY-MM-DD|null"},
-            "operation": "detail|aggregate|ranking|trend",
-            "confidence": "0~1",
-        },
+    """作用：拼接系统提示词与 KB 提示。两者跨请求不变，置于消息前缀可命中服务商的前缀缓存。"""
+    kb_payload: dict[str, Any] = {
+        "kb_field_whitelist": list(field_whitelist),
+        "alias_hints": list(alias_pairs),
     }
-    return json.dumps(payload, ensure_ascii=False)
\ No newline at end of file
+    # OPT_SORT_KEYS：键序固定，多进程间前缀字节一致，缓存命中不受字典插入序影响。
+    kb_body = orjson.dumps(kb_payload, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    return f"{TASK_PARSE_SYSTEM_PROMPT}\n\n知识库提示（kb_field_whitelist 与 alias_hints）：\n{kb_body}"
+
+
+def build_task_parse_user_prompt(query: str) -> str:
+    payload: dict[str, Any] = {"query": query}
+    body = orjson.dumps(payload)
+    return (body[:-1] + b',"output_schema":' + _OUTPUT_SCHEMA_BYTES + b"}").decode("utf-8")
\ No newline at end of file
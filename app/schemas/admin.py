@@ -1,4 +1,4 @@
-﻿from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class AdminProfile(BaseModel):
@@ -9,11 +9,12 @@ class AdminProfile(BaseModel):
     email: str | None = None
     status: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class AdminCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     username: str
     password: str
     real_name: str | None = None
@@ -23,6 +24,8 @@ class AdminCreate(BaseModel):
 
 
 class AdminUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     password: str | None = None
     real_name: str | None = None
     phone: str | None = None
@@ -40,5 +43,4 @@ class AdminOut(BaseModel):
     status: str
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,7 +1,9 @@
-﻿from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ClassCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     class_name: str
     class_code: str
     major_id: int
@@ -11,6 +13,8 @@ class ClassCreate(BaseModel):
 
 
 class ClassUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     class_name: str | None = None
     class_code: str | None = None
     major_id: int | None = None
@@ -30,5 +34,4 @@ class ClassOut(BaseModel):
     student_count: int | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,13 +1,17 @@
-﻿from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class CollegeCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     college_name: str
     college_code: str
     description: str | None = None
 
 
 class CollegeUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     college_name: str | None = None
     college_code: str | None = None
     description: str | None = None
@@ -21,5 +25,4 @@ class CollegeOut(BaseModel):
     description: str | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
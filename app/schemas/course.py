@@ -1,7 +1,9 @@
-﻿from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class CourseCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     course_name: str
     course_code: str
     credit: float | None = None
@@ -12,6 +14,8 @@ class CourseCreate(BaseModel):
 
 
 class CourseUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     course_name: str | None = None
     course_code: str | None = None
     credit: float | None = None
@@ -33,5 +37,4 @@ class CourseOut(BaseModel):
     description: str | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
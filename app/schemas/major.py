@@ -1,7 +1,9 @@
-﻿from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class MajorCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     major_name: str
     major_code: str
     college_id: int
@@ -10,6 +12,8 @@ class MajorCreate(BaseModel):
 
 
 class MajorUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     major_name: str | None = None
     major_code: str | None = None
     college_id: int | None = None
@@ -27,5 +31,4 @@ class MajorOut(BaseModel):
     description: str | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
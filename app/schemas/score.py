@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class ScoreOut(BaseModel):
+    id: int
+    student_id: int
+    course_id: int
+    course_name: str
+    course_code: str
+    course_class_id: int
+    term: str
+    score_value: float | None = None
+    score_level: str | None = None
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
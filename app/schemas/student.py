@@ -1,8 +1,10 @@
-﻿from datetime import date
-from pydantic import BaseModel
+from datetime import date
+from pydantic import BaseModel, ConfigDict
 
 
 class StudentCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     student_no: str
     real_name: str
     gender: str | None = None
@@ -19,6 +21,8 @@ class StudentCreate(BaseModel):
 
 
 class StudentUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     student_no: str | None = None
     real_name: str | None = None
     gender: str | None = None
@@ -52,5 +56,4 @@ class StudentOut(BaseModel):
     status: str | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
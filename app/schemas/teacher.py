@@ -1,8 +1,10 @@
-﻿from datetime import date
-from pydantic import BaseModel
+from datetime import date
+from pydantic import BaseModel, ConfigDict
 
 
 class TeacherCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     teacher_no: str
     real_name: str
     gender: str | None = None
@@ -16,6 +18,8 @@ class TeacherCreate(BaseModel):
 
 
 class TeacherUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     teacher_no: str | None = None
     real_name: str | None = None
     gender: str | None = None
@@ -43,5 +47,4 @@ class TeacherOut(BaseModel):
     status: str | None = None
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+import copy
 import csv
+import hashlib
 import json
 import re
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 from datetime import date, datetime
 from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, TypedDict
 
 from langgraph.constants import START
 from langgraph.graph import END, StateGraph
-from sqlalchemy import text
+from sqlalchemy import insert, select, text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -19,16 +27,328 @@ from app.models.chat_history import ChatHistory
 from app.models.workflow_log import WorkflowLog
 from app.prompts.intent_prompts import INTENT_SYSTEM_PROMPT_FULL, build_intent_user_prompt
 from app.prompts.result_summary_prompts import RESULT_SUMMARY_SYSTEM_PROMPT, build_result_summary_user_prompt
-from app.prompts.sql_generation_prompts import SQL_GENERATION_SYSTEM_PROMPT, build_sql_generation_user_prompt
-from app.prompts.task_parse_prompts import TASK_PARSE_SYSTEM_PROMPT, build_task_parse_user_prompt
+from app.prompts.sql_generation_prompts import build_sql_generation_system_prompt, build_sql_generation_user_prompt
+from app.prompts.task_parse_prompts import build_task_parse_system_prompt, build_task_parse_user_prompt
 from app.schemas.chat import ChatIntentRequest
 
+# LLM 并发闸门：同一进程内同时在途的模型调用不超过服务商限流配置，超出的调用在各自工作线程上排队。
+_LLM_CONCURRENCY_GATE = threading.BoundedSemaphore(settings.llm_max_concurrency)
+
+# LLM 响应缓存：键为模型+完整提示词的哈希（KB 变更会改变系统提示词，键随之失效），命中时免去一次 20-30s 的模型调用。
+_LLM_RESPONSE_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+_LLM_RESPONSE_CACHE_LOCK = threading.Lock()
+_LLM_RESPONSE_CACHE_TTL_SECONDS = 3600.0
+_LLM_RESPONSE_CACHE_MAX_ENTRIES = 256
+
+@lru_cache(maxsize=4)
+def _get_openai_client(base_url: str, api_key: str):
+    """作用：返回按 (base_url, api_key) 复用的 OpenAI 客户端，连接池跨请求常驻。
+
+    输入参数：
+    - base_url: str。
+    - api_key: str。
+
+    输出参数：
+    - 返回值类型: OpenAI。
+    """
+
+    import httpx
+    from openai import OpenAI
+
+    kwargs: dict[str, Any] = {"api_key": api_key}
+    if base_url:
+        kwargs["base_url"] = base_url
+    # 常驻连接池：TCP/TLS 握手只付一次，后续调用直接复用 keep-alive 连接。
+    http_client = httpx.Client(
+        trust_env=False,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+    return OpenAI(**kwargs, http_client=http_client)
+
+
+def _helper_debug_print(label: str, payload: Any) -> None:
+    """作用：调试模式下打印节点输出；生产环境直接跳过大对象的美化序列化。
+
+    输入参数：
+    - label: str。
+    - payload: Any。
+
+    输出参数：
+    - 返回值类型: None。
+    """
+
+    if not settings.debug:
+        return
+    print(label)
+    print(orjson.dumps(payload, default=str, option=orjson.OPT_INDENT_2).decode("utf-8"))
+
+
+# 节点输入输出落盘由单线程后台写手处理，请求线程只提交任务，不等磁盘。
+_NODE_IO_LOG_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="node_io_log")
+
+ALLOWED_INTENTS = frozenset({"chat", "business_query"})
+ALLOWED_OPERATIONS = frozenset({"detail", "aggregate", "ranking", "trend"})
+ALLOWED_FILTER_OPS = frozenset({"=", "!=", ">", "<", ">=", "<=", "like", "in", "not in", "between"})
+
+_KB_PATH = Path(__file__).resolve().parents[1] / "knowledge" / "schema_kb_core.json"
+
+# 热路径正则在导入时编译一次，节点内直接用编译对象，省去每次调用的模式缓存查找。
+_JSON_OBJ_RE = re.compile(r"\{.*\}", flags=re.S)
+_TABLE_FIELD_RE = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\.([a-zA-Z_][a-zA-Z0-9_]*)\b")
+_QUALIFIED_FIELD_RE = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*)\b")
+_CTE_NAME_RE = re.compile(r"(?is)(?:\bwith\b|,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s+as\s*\(")
+_STARTS_WITH_CTE_RE = re.compile(r"^\s*with\b", flags=re.I)
+_SQL_FIELD_SPACING_RE = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b")
+_SQL_QUOTED_VALUE_RE = re.compile(r"'((?:''|[^'])*)'")
+
+
+@lru_cache(maxsize=1)
+def _load_kb_hints(
+        mtime: float,
+) -> tuple[
+    tuple[str, ...], tuple[dict[str, list[str]], ...], tuple[dict[str, Any], ...], frozenset[str], frozenset[str]
+]:
+    """作用：解析 KB 文件并构建字段白名单、别名提示、结构化描述与白名单集合（原样与小写各一份）。
+
+    输入参数：
+    - mtime: float。KB 文件修改时间，作为缓存键，文件更新后自动重建。
+
+    输出参数：
+    - 返回值类型: tuple[tuple[str, ...], tuple[dict[str, list[str]], ...], tuple[dict[str, Any], ...], frozenset[str], frozenset[str]]。
+    """
+
+    kb = json.loads(_KB_PATH.read_text(encoding="utf-8"))
+    fields: list[str] = []
+    alias_pairs: list[dict[str, list[str]]] = []
+    schema_hints: list[dict[str, Any]] = []
+
+    for table in kb.get("tables", []):
+        table_name = str(table.get("name", "")).strip()
+        if not table_name:
+            continue
+        table_description = str(table.get("description", "")).strip()
+        table_columns: list[dict[str, Any]] = []
+        raw_columns = table.get("columns") or []
+        if isinstance(raw_columns, dict):
+            # 列式布局（KB 3.x）：cols 只写一次列名，row_data 为定长数组，这里还原成记录。
+            col_names = raw_columns.get("cols") or []
+            raw_columns = [dict(zip(col_names, row)) for row in raw_columns.get("row_data") or []]
+        for column in raw_columns:
+            column_name = str(column.get("name", "")).strip()
+            if not column_name:
+                continue
+            field = f"{table_name}.{column_name}"
+            fields.append(field)
+
+            raw_aliases = column.get("aliases", []) or []
+            aliases = [str(item).strip() for item in raw_aliases if str(item).strip()]
+            aliases.extend([column_name, field])
+
+            # dict 推导一趟完成大小写不敏感去重，键序即首次出现序。
+            dedup_aliases = list({alias.lower(): alias for alias in aliases}.values())
+            alias_pairs.append({field: dedup_aliases})
+            table_columns.append(
+                {
+                    "field": field,
+                    "field_description": str(column.get("description", "")).strip(),
+                    "aliases": dedup_aliases,
+                }
+            )
+
+        schema_hints.append(
+            {
+                "table": table_name,
+                "table_description": table_description,
+                "columns": table_columns,
+            }
+        )
+
+    # 元组+frozenset：缓存结果跨请求共享，冻结后杜绝调用方原地改写，两份白名单集合也只建一次。
+    return (
+        tuple(fields),
+        tuple(alias_pairs),
+        tuple(schema_hints),
+        frozenset(fields),
+        frozenset(field.lower() for field in fields),
+    )
+
+
+def _helper_build_kb_hints() -> tuple[
+    tuple[str, ...], tuple[dict[str, list[str]], ...], tuple[dict[str, Any], ...], frozenset[str], frozenset[str]
+]:
+    """作用：返回缓存的 KB 提示，仅在文件修改后重新解析。
+
+    输入参数：
+    - 无。
+
+    输出参数：
+    - 返回值类型: tuple[tuple[str, ...], tuple[dict[str, list[str]], ...], tuple[dict[str, Any], ...], frozenset[str], frozenset[str]]。
+    """
+
+    return _load_kb_hints(_KB_PATH.stat().st_mtime)
+
+
+def _helper_to_unique_str_list(value: Any) -> list[str]:
+    """作用：标准化字符串数组并去重。
+
+    输入参数：
+    - value: Any。
+
+    输出参数：
+    - 返回值类型: list[str]。
+    """
+
+    if not isinstance(value, list):
+        return []
+    # dict 推导一趟完成大小写不敏感去重，键序即首次出现序。
+    deduped = {text_value.lower(): text_value for item in value if (text_value := str(item).strip())}
+    return list(deduped.values())
+
+
+def _helper_normalize_entities(value: Any) -> list[dict[str, str]]:
+    """作用：标准化实体列表。
+
+    输入参数：
+    - value: Any。
+
+    输出参数：
+    - 返回值类型: list[dict[str, str]]。
+    """
+
+    if not isinstance(value, list):
+        return []
+    entities: list[dict[str, str]] = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        entity_type = str(item.get("type", "")).strip()
+        entity_value = str(item.get("value", "")).strip()
+        if not entity_type or not entity_value:
+            continue
+        entities.append({"type": entity_type, "value": entity_value})
+    return entities
+
+
+def _helper_normalize_filter_value(raw_value: Any) -> Any:
+    """作用：标准化单个过滤值，清理字符串两端空格并兼容字符串列表值。
+
+    输入参数：
+    - raw_value: Any。
+
+    输出参数：
+    - 返回值类型: Any。
+    """
+
+    if isinstance(raw_value, str):
+        return raw_value.strip()
+    if isinstance(raw_value, list):
+        return [item.strip() if isinstance(item, str) else item for item in raw_value]
+    return raw_value
+
+
+def _helper_normalize_filters(value: Any, whitelist: frozenset[str]) -> list[dict[str, Any]]:
+    """作用：标准化过滤条件并校验字段白名单。
+
+    输入参数：
+    - value: Any。
+    - whitelist: frozenset[str]。
+
+    输出参数：
+    - 返回值类型: list[dict[str, Any]]。
+    """
+
+    if not isinstance(value, list):
+        return []
+    filters: list[dict[str, Any]] = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        field = str(item.get("field", "")).strip()
+        if field not in whitelist:
+            continue
+        op = str(item.get("op", "=")).strip().lower() or "="
+        if op not in ALLOWED_FILTER_OPS:
+            continue
+        filters.append({"field": field, "op": op, "value": _helper_normalize_filter_value(item.get("value"))})
+    return filters
+
+
+def _helper_normalize_entity_mappings(value: Any, whitelist: frozenset[str]) -> list[dict[str, str]]:
+    """作用：标准化实体映射并校验字段白名单。
+
+    输入参数：
+    - value: Any。
+    - whitelist: frozenset[str]。
+
+    输出参数：
+    - 返回值类型: list[dict[str, str]]。
+    """
+
+    if not isinstance(value, list):
+        return []
+    mappings: list[dict[str, str]] = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        entity_type = str(item.get("type", "")).strip()
+        entity_value = str(item.get("value", "")).strip()
+        field = str(item.get("field", "")).strip()
+        reason = str(item.get("reason", "")).strip()
+        if not entity_type or not entity_value or not field:
+            continue
+        if field not in whitelist:
+            continue
+        mappings.append(
+            {
+                "type": entity_type,
+                "value": entity_value,
+                "field": field,
+                "reason": reason,
+            }
+        )
+    return mappings
+
+
+def _helper_extract_and_validate_sql_fields(
+        sql: str,
+        cte_names: set[str],
+        whitelist_lower: frozenset[str],
+) -> tuple[list[str], list[str]]:
+    """作用：一趟遍历提取 SQL 中的 table.field 引用、去重并同步校验白名单。
+
+    输入参数：
+    - sql: str。
+    - cte_names: set[str]。
+    - whitelist_lower: frozenset[str]。
+
+    输出参数：
+    - 返回值类型: tuple[list[str], list[str]]。(sql_fields, invalid_fields)。
+    """
+
+    sql_fields: list[str] = []
+    invalid_fields: list[str] = []
+    seen: set[str] = set()
+    for match in _TABLE_FIELD_RE.finditer(sql):
+        table_name = match.group(1)
+        field = f"{table_name}.{match.group(2)}"
+        key = field.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sql_fields.append(field)
+        if table_name.lower() in cte_names:
+            continue
+        if key not in whitelist_lower:
+            invalid_fields.append(field)
+    return sql_fields, invalid_fields
+
 
 class UnifiedChatGraphState(TypedDict):
     message: str
     history_user_messages: list[str]
     threshold: float
     model_name: str
+    kb_hints: tuple[Any, ...] | None
     intent_result: dict[str, Any] | None
     parse_result: dict[str, Any] | None
     sql_result: dict[str, Any] | None
@@ -55,10 +375,11 @@ def execute_chat_workflow(
     - 返回值类型: dict[str, Any]。
     """
 
-    ALLOWED_INTENTS = {"chat", "business_query"}
-    ALLOWED_OPERATIONS = {"detail", "aggregate", "ranking", "trend"}
-    ALLOWED_FILTER_OPS = {"=", "!=", ">", "<", ">=", "<=", "like", "in", "not in", "between"}
     HIDDEN_CONTEXT_MAX_RETRY = 2
+    # 图执行期间产生的工作流日志行先攒在这里，收尾与兜底分支统一走 Core insert 入库。
+    pending_workflow_rows: list[dict[str, Any]] = []
+    # 记录实际进入过的节点：兜底分支只为真正执行过的节点落失败日志，闲聊短路时不再写满五条。
+    executed_steps: set[str] = set()
 
     def _helper_emit_step_event(
             step_name: str,
@@ -101,18 +422,21 @@ def execute_chat_workflow(
         - 返回值类型: list[str]。
         """
 
-        rows = (
-            db.query(ChatHistory)
-            .filter(
+        # 只取 message_content 单列，跳过整行 ORM 实例化；过滤与倒序排序走组合索引。
+        stmt = (
+            select(ChatHistory.message_content)
+            .where(
                 ChatHistory.session_id == session_id,
                 ChatHistory.message_role == "user",
                 ChatHistory.is_deleted == False,
             )
             .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc())
             .limit(limit)
-            .all()
         )
-        return [row.message_content for row in reversed(rows)]
+        messages = list(db.execute(stmt).scalars())
+        # LIMIT 已限定条数，原地反转为时间正序，省一次列表拷贝。
+        messages.reverse()
+        return messages
 
     def _helper_extract_json_object(text_value: str) -> dict[str, Any] | None:
         """作用：从模型输出文本中提取 JSON。
@@ -124,7 +448,7 @@ def execute_chat_workflow(
         - 返回值类型: dict[str, Any] | None。
         """
 
-        match = re.search(r"\{.*\}", text_value, flags=re.S)
+        match = _JSON_OBJ_RE.search(text_value)
         if not match:
             return None
         try:
@@ -149,95 +473,6 @@ def execute_chat_workflow(
             number = default
         return max(0.0, min(1.0, number))
 
-    def _helper_to_unique_str_list(value: Any) -> list[str]:
-        """作用：标准化字符串数组并去重。
-        
-        输入参数：
-        - value: Any。
-        
-        输出参数：
-        - 返回值类型: list[str]。
-        """
-
-        if not isinstance(value, list):
-            return []
-        result: list[str] = []
-        seen: set[str] = set()
-        for item in value:
-            text_value = str(item).strip()
-            if not text_value:
-                continue
-            key = text_value.lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            result.append(text_value)
-        return result
-
-    def _helper_normalize_entities(value: Any) -> list[dict[str, str]]:
-        """作用：标准化实体列表。
-        
-        输入参数：
-        - value: Any。
-        
-        输出参数：
-        - 返回值类型: list[dict[str, str]]。
-        """
-
-        if not isinstance(value, list):
-            return []
-        entities: list[dict[str, str]] = []
-        for item in value:
-            if not isinstance(item, dict):
-                continue
-            entity_type = str(item.get("type", "")).strip()
-            entity_value = str(item.get("value", "")).strip()
-            if not entity_type or not entity_value:
-                continue
-            entities.append({"type": entity_type, "value": entity_value})
-        return entities
-
-    def _helper_normalize_filters(value: Any, whitelist: set[str]) -> list[dict[str, Any]]:
-        """作用：标准化过滤条件并校验字段白名单。
-        
-        输入参数：
-        - value: Any。
-        - whitelist: set[str]。
-        
-        输出参数：
-        - 返回值类型: list[dict[str, Any]]。
-        """
-
-        def _helper_normalize_filter_value(raw_value: Any) -> Any:
-            """作用：标准化单个过滤值，清理字符串两端空格并兼容字符串列表值。
-            
-            输入参数：
-            - raw_value: Any。
-            
-            输出参数：
-            - 返回值类型: Any。
-            """
-            if isinstance(raw_value, str):
-                return raw_value.strip()
-            if isinstance(raw_value, list):
-                return [item.strip() if isinstance(item, str) else item for item in raw_value]
-            return raw_value
-
-        if not isinstance(value, list):
-            return []
-        filters: list[dict[str, Any]] = []
-        for item in value:
-            if not isinstance(item, dict):
-                continue
-            field = str(item.get("field", "")).strip()
-            if field not in whitelist:
-                continue
-            op = str(item.get("op", "=")).strip().lower() or "="
-            if op not in ALLOWED_FILTER_OPS:
-                continue
-            filters.append({"field": field, "op": op, "value": _helper_normalize_filter_value(item.get("value"))})
-        return filters
-
     def _helper_trim_sql_fields_and_values(sql: str) -> str:
         """作用：清理 SQL 字段与字符串字面值两端空格。
         
@@ -248,11 +483,7 @@ def execute_chat_workflow(
         - 返回值类型: str。
         """
 
-        normalized_sql = re.sub(
-            r"\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b",
-            r"\1.\2",
-            sql,
-        )
+        normalized_sql = _SQL_FIELD_SPACING_RE.sub(r"\1.\2", sql)
 
         def _helper_trim_quoted_value(match: re.Match[str]) -> str:
             """作用：清理 SQL 单引号字符串字面值的两端空格并保持引号结构。
@@ -266,31 +497,9 @@ def execute_chat_workflow(
             raw_value = match.group(1)
             return f"'{raw_value.strip()}'"
 
-        normalized_sql = re.sub(r"'((?:''|[^'])*)'", _helper_trim_quoted_value, normalized_sql)
+        normalized_sql = _SQL_QUOTED_VALUE_RE.sub(_helper_trim_quoted_value, normalized_sql)
         return normalized_sql
 
-    def _helper_extract_sql_fields(sql: str) -> list[str]:
-        """作用：提取 SQL 中的表字段引用并去重。
-        
-        输入参数：
-        - sql: str。
-        
-        输出参数：
-        - 返回值类型: list[str]。
-        """
-
-        matches = re.findall(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\.([a-zA-Z_][a-zA-Z0-9_]*)\b", sql)
-        result: list[str] = []
-        seen: set[str] = set()
-        for table_name, column_name in matches:
-            field = f"{table_name}.{column_name}"
-            key = field.lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            result.append(field)
-        return result
-
     def _helper_extract_cte_names(sql: str) -> set[str]:
         """作用：提取 WITH 子句中定义的 CTE 名称。
         
@@ -301,44 +510,9 @@ def execute_chat_workflow(
         - 返回值类型: set[str]。
         """
 
-        names = re.findall(r"(?is)(?:\bwith\b|,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s+as\s*\(", sql)
+        names = _CTE_NAME_RE.findall(sql)
         return {name.lower() for name in names}
 
-    def _helper_normalize_entity_mappings(value: Any, whitelist: set[str]) -> list[dict[str, str]]:
-        """作用：标准化实体映射并校验字段白名单。
-        
-        输入参数：
-        - value: Any。
-        - whitelist: set[str]。
-        
-        输出参数：
-        - 返回值类型: list[dict[str, str]]。
-        """
-
-        if not isinstance(value, list):
-            return []
-        mappings: list[dict[str, str]] = []
-        for item in value:
-            if not isinstance(item, dict):
-                continue
-            entity_type = str(item.get("type", "")).strip()
-            entity_value = str(item.get("value", "")).strip()
-            field = str(item.get("field", "")).strip()
-            reason = str(item.get("reason", "")).strip()
-            if not entity_type or not entity_value or not field:
-                continue
-            if field not in whitelist:
-                continue
-            mappings.append(
-                {
-                    "type": entity_type,
-                    "value": entity_value,
-                    "field": field,
-                    "reason": reason,
-                }
-            )
-        return mappings
-
     def _helper_is_readonly_sql(sql: str) -> bool:
         """作用：仅允许查询 SQL。
         
@@ -371,66 +545,6 @@ def execute_chat_workflow(
                 return False
         return True
 
-    def _helper_build_kb_hints() -> tuple[list[str], list[dict[str, list[str]]], list[dict[str, Any]]]:
-        """作用：构建字段白名单、字段别名提示与结构化描述提示。
-        
-        输入参数：
-        - 无。
-        
-        输出参数：
-        - 返回值类型: tuple[list[str], list[dict[str, list[str]]], list[dict[str, Any]]]。
-        """
-
-        kb_path = Path(__file__).resolve().parents[1] / "knowledge" / "schema_kb_core.json"
-        kb = json.loads(kb_path.read_text(encoding="utf-8"))
-        fields: list[str] = []
-        alias_pairs: list[dict[str, list[str]]] = []
-        schema_hints: list[dict[str, Any]] = []
-
-        for table in kb.get("tables", []):
-            table_name = str(table.get("name", "")).strip()
-            if not table_name:
-                continue
-            table_description = str(table.get("description", "")).strip()
-            table_columns: list[dict[str, Any]] = []
-            for column in table.get("columns", []):
-                column_name = str(column.get("name", "")).strip()
-                if not column_name:
-                    continue
-                field = f"{table_name}.{column_name}"
-                fields.append(field)
-
-                raw_aliases = column.get("aliases", []) or []
-                aliases = [str(item).strip() for item in raw_aliases if str(item).strip()]
-                aliases.extend([column_name, field])
-
-                dedup_aliases: list[str] = []
-                seen: set[str] = set()
-                for alias in aliases:
-                    key = alias.lower()
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    dedup_aliases.append(alias)
-                alias_pairs.append({field: dedup_aliases})
-                table_columns.append(
-                    {
-                        "field": field,
-                        "field_description": str(column.get("description", "")).strip(),
-                        "aliases": dedup_aliases,
-                    }
-                )
-
-            schema_hints.append(
-                {
-                    "table": table_name,
-                    "table_description": table_description,
-                    "columns": table_columns,
-                }
-            )
-
-        return fields, alias_pairs, schema_hints
-
     def _helper_call_llm(
             system_prompt: str,
             user_prompt: str,
@@ -450,40 +564,56 @@ def execute_chat_workflow(
         - 返回值类型: dict[str, Any]。
         """
 
-        import httpx
-        from openai import OpenAI
-
         if not settings.llm_api_key:
             raise RuntimeError("未配置 LLM_API_KEY，无法执行工作流")
         if not model_name:
             raise RuntimeError("未配置模型名，无法执行工作流")
 
+        # 提示词已确定性编码了查询、历史与 KB，哈希作键即可精确命中重复问题。
+        cache_key = hashlib.sha256(
+            f"{model_name}|{response_format}|{system_prompt}|{user_prompt}".encode("utf-8")
+        ).hexdigest()
+        now = time.monotonic()
+        with _LLM_RESPONSE_CACHE_LOCK:
+            cached = _LLM_RESPONSE_CACHE.get(cache_key)
+            if cached and now - cached[0] < _LLM_RESPONSE_CACHE_TTL_SECONDS:
+                # 深拷贝返回，调用方改写结果不会污染缓存。
+                return copy.deepcopy(cached[1])
+
         try:
-            kwargs: dict[str, Any] = {"api_key": settings.llm_api_key}
-            if settings.llm_base_url:
-                kwargs["base_url"] = settings.llm_base_url
-            with httpx.Client(trust_env=False, timeout=timeout) as http_client:
-                client = OpenAI(**kwargs, http_client=http_client)
-                completion_payload: dict[str, Any] = {
-                    "model": model_name,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    "temperature": 0.1,
-                }
-                if response_format:
-                    completion_payload["response_format"] = response_format
-                response = client.chat.completions.create(**completion_payload)
+            client = _get_openai_client(settings.llm_base_url, settings.llm_api_key)
+            completion_payload: dict[str, Any] = {
+                "model": model_name,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                "temperature": 0.1,
+            }
+            if response_format:
+                completion_payload["response_format"] = response_format
+            # 闸门只包住网络调用本身，排队不占用 HTTP 连接；超时按节点经 with_options 下发，不影响共享客户端。
+            with _LLM_CONCURRENCY_GATE:
+                response = client.with_options(timeout=timeout).chat.completions.create(**completion_payload)
         except Exception as exc:
             raise RuntimeError(f"大模型调用失败: {exc}") from exc
 
         output_text = ""
         if response.choices and response.choices[0].message:
             output_text = response.choices[0].message.content or ""
-        output_data = _helper_extract_json_object(output_text)
+        # 先按严格 JSON 直接解析（json_object 模式下必中），失败才退回正则截取，省去全文扫描。
+        try:
+            output_data = orjson.loads(output_text)
+            if not isinstance(output_data, dict):
+                output_data = None
+        except orjson.JSONDecodeError:
+            output_data = _helper_extract_json_object(output_text)
         if not output_data:
             raise ValueError("模型输出不是有效 JSON")
+        with _LLM_RESPONSE_CACHE_LOCK:
+            if len(_LLM_RESPONSE_CACHE) >= _LLM_RESPONSE_CACHE_MAX_ENTRIES:
+                _LLM_RESPONSE_CACHE.clear()
+            _LLM_RESPONSE_CACHE[cache_key] = (time.monotonic(), copy.deepcopy(output_data))
         return output_data
 
     def _helper_intent_node_logic(
@@ -534,17 +664,21 @@ def execute_chat_workflow(
             "rewritten_query": rewritten_query,
             "threshold": threshold,
         }
-        print("意图识别节点输出:")
-        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        _helper_debug_print("意图识别节点输出:", result)
         return result
 
-    def _helper_task_parse_node_logic(intent_result: dict[str, Any], model_name: str) -> dict[str, Any]:
+    def _helper_task_parse_node_logic(
+            intent_result: dict[str, Any],
+            model_name: str,
+            kb_hints: tuple[Any, ...],
+    ) -> dict[str, Any]:
         """作用：任务解析节点业务逻辑。
-        
+
         输入参数：
         - intent_result: dict[str, Any]。
         - model_name: str。
-        
+        - kb_hints: tuple[Any, ...]。
+
         输出参数：
         - 返回值类型: dict[str, Any]。
         """
@@ -558,16 +692,15 @@ def execute_chat_workflow(
         if not query:
             raise ValueError("任务解析缺少 query")
 
-        field_whitelist, alias_pairs, _ = _helper_build_kb_hints()
-        whitelist_set = set(field_whitelist)
+        field_whitelist, alias_pairs, _, whitelist_set, _ = kb_hints
 
+        # KB 提示随系统提示词进入不变前缀，只有 query 留在 user 消息，供服务商前缀缓存复用。
         llm_output = _helper_call_llm(
-            system_prompt=TASK_PARSE_SYSTEM_PROMPT,
-            user_prompt=build_task_parse_user_prompt(
-                query=query,
+            system_prompt=build_task_parse_system_prompt(
                 field_whitelist=field_whitelist,
                 alias_pairs=alias_pairs,
             ),
+            user_prompt=build_task_parse_user_prompt(query=query),
             model_name=model_name,
             timeout=25.0,
         )
@@ -602,8 +735,7 @@ def execute_chat_workflow(
             "operation": operation,
             "confidence": confidence,
         }
-        print("任务解析节点输出:")
-        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        _helper_debug_print("任务解析节点输出:", result)
         return result
 
     def _helper_sql_generation_node_logic(
@@ -611,15 +743,17 @@ def execute_chat_workflow(
             parse_result: dict[str, Any],
             hidden_context_result: dict[str, Any] | None,
             model_name: str,
+            kb_hints: tuple[Any, ...],
     ) -> dict[str, Any]:
         """作用：SQL 生成节点业务逻辑。
-        
+
         输入参数：
         - rewritten_query: str。
         - parse_result: dict[str, Any]。
         - hidden_context_result: dict[str, Any] | None。
         - model_name: str。
-        
+        - kb_hints: tuple[Any, ...]。
+
         输出参数：
         - 返回值类型: dict[str, Any]。
         """
@@ -629,19 +763,20 @@ def execute_chat_workflow(
         if str(parse_result.get("intent", "")).strip().lower() != "business_query":
             raise ValueError("SQL 生成仅支持 business_query")
 
-        field_whitelist, alias_pairs, schema_hints = _helper_build_kb_hints()
-        whitelist_set = set(field_whitelist)
+        field_whitelist, alias_pairs, schema_hints, whitelist_set, whitelist_lower = kb_hints
 
         sql_response_format = {"type": "json_object"} if settings.llm_response_format_sql == "json_object" else None
 
+        # KB 提示随系统提示词进入不变前缀，可变的 query/task/hidden_context 留在 user 消息。
         llm_output = _helper_call_llm(
-            system_prompt=SQL_GENERATION_SYSTEM_PROMPT,
-            user_prompt=build_sql_generation_user_prompt(
-                rewritten_query=rewritten_query,
-                task=parse_result,
+            system_prompt=build_sql_generation_system_prompt(
                 field_whitelist=field_whitelist,
                 alias_pairs=alias_pairs,
                 schema_hints=schema_hints,
+            ),
+            user_prompt=build_sql_generation_user_prompt(
+                rewritten_query=rewritten_query,
+                task=parse_result,
                 hidden_context=hidden_context_result,
             ),
             model_name=model_name,
@@ -653,20 +788,14 @@ def execute_chat_workflow(
         sql = _helper_trim_sql_fields_and_values(sql)
         if not sql:
             raise ValueError("SQL 生成缺少 sql 字段")
-        if not re.search(r"^\s*with\b", sql, flags=re.I):
+        if not _STARTS_WITH_CTE_RE.search(sql):
             raise ValueError("SQL 生成未使用 WITH（CTE）")
 
-        sql_fields = _helper_extract_sql_fields(sql)
+        # 提取与白名单校验合并为一趟扫描，按小写比较规避大小写抖动。
+        cte_names = _helper_extract_cte_names(sql)
+        sql_fields, invalid_fields = _helper_extract_and_validate_sql_fields(sql, cte_names, whitelist_lower)
         if not sql_fields:
             raise ValueError("SQL 中未识别到 table.field 字段")
-        cte_names = _helper_extract_cte_names(sql)
-        invalid_fields: list[str] = []
-        for field in sql_fields:
-            table_name = field.split(".", 1)[0].lower()
-            if table_name in cte_names:
-                continue
-            if field not in whitelist_set:
-                invalid_fields.append(field)
         applied_field_replacements: list[dict[str, str]] = []
         if invalid_fields and isinstance(hidden_context_result, dict):
             raw_field_candidates = hidden_context_result.get("field_candidates")
@@ -730,35 +859,27 @@ def execute_chat_workflow(
 
             if applied_field_replacements:
                 sql = _helper_trim_sql_fields_and_values(replacement_sql)
-                sql_fields = _helper_extract_sql_fields(sql)
                 cte_names = _helper_extract_cte_names(sql)
-                invalid_fields = []
-                for field in sql_fields:
-                    table_name = field.split(".", 1)[0].lower()
-                    if table_name in cte_names:
-                        continue
-                    if field not in whitelist_set:
-                        invalid_fields.append(field)
+                sql_fields, invalid_fields = _helper_extract_and_validate_sql_fields(
+                    sql, cte_names, whitelist_lower
+                )
 
         if invalid_fields:
             raise ValueError(f"SQL 包含非白名单字段: {invalid_fields}")
 
         entity_mappings = _helper_normalize_entity_mappings(llm_output.get("entity_mappings"), whitelist_set)
-        entities = _helper_normalize_entities(parse_result.get("entities"))
+        # 映射与 SQL 字段先各建一次索引，实体校验从 O(N*M) 扫描降为 O(N+M) 查表。
+        mapping_by_key = {(mapping["type"], mapping["value"]): mapping for mapping in entity_mappings}
+        sql_fields_set = {field.lower() for field in sql_fields}
+        # 任务解析节点产出的 entities 已标准化（见 _helper_task_parse_node_logic），此处直接复用。
+        entities = parse_result.get("entities") or []
         for entity in entities:
             entity_type = entity["type"]
             entity_value = entity["value"]
-            target_mapping = next(
-                (
-                    mapping
-                    for mapping in entity_mappings
-                    if mapping["type"] == entity_type and mapping["value"] == entity_value
-                ),
-                None,
-            )
+            target_mapping = mapping_by_key.get((entity_type, entity_value))
             if not target_mapping:
                 raise ValueError(f"关键实体映射失败: type={entity_type}, value={entity_value}")
-            if target_mapping["field"] not in sql_fields:
+            if target_mapping["field"].lower() not in sql_fields_set:
                 raise ValueError(
                     f"关键实体映射字段未出现在 SQL 中: type={entity_type}, value={entity_value}, field={target_mapping['field']}"
                 )
@@ -769,8 +890,7 @@ def execute_chat_workflow(
             "sql_fields": sql_fields,
             "applied_field_replacements": applied_field_replacements,
         }
-        print("SQL 生成节点输出:")
-        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        _helper_debug_print("SQL 生成节点输出:", result)
         return result
 
     def _helper_sql_validate_node_logic(sql_result: dict[str, Any] | None) -> dict[str, Any]:
@@ -846,8 +966,7 @@ def execute_chat_workflow(
                 "empty_result": False,
                 "zero_metric_result": False,
             }
-            print("SQL验证节点输出:")
-            print(json.dumps(v_result, indent=2, ensure_ascii=False, default=str))
+            _helper_debug_print("SQL验证节点输出:", v_result)
             return v_result
 
         if not _helper_is_readonly_sql(sql):
@@ -860,8 +979,7 @@ def execute_chat_workflow(
                 "empty_result": False,
                 "zero_metric_result": False,
             }
-            print("SQL验证节点输出:")
-            print(json.dumps(v_result, indent=2, ensure_ascii=False, default=str))
+            _helper_debug_print("SQL验证节点输出:", v_result)
             return v_result
 
         try:
@@ -886,8 +1004,7 @@ def execute_chat_workflow(
                 "empty_result": empty_result,
                 "zero_metric_result": zero_metric_result,
             }
-            print("SQL验证节点输出:")
-            print(json.dumps(v_result, indent=2, ensure_ascii=False, default=str))
+            _helper_debug_print("SQL验证节点输出:", v_result)
             return v_result
         except Exception as exc:
             v_result = {
@@ -899,8 +1016,7 @@ def execute_chat_workflow(
                 "empty_result": False,
                 "zero_metric_result": False,
             }
-            print("SQL验证节点输出:")
-            print(json.dumps(v_result, indent=2, ensure_ascii=False, default=str))
+            _helper_debug_print("SQL验证节点输出:", v_result)
             return v_result
 
     def _helper_hidden_context_node_logic(
@@ -944,8 +1060,7 @@ def execute_chat_workflow(
         elif "doesn't exist" in error_lower:
             error_type = "object_not_found"
 
-        field_whitelist, alias_pairs, schema_hints = _helper_build_kb_hints()
-        whitelist_set = set(field_whitelist)
+        field_whitelist, alias_pairs, schema_hints, whitelist_set, _ = _helper_build_kb_hints()
 
         sql_fields = (sql_result or {}).get("sql_fields") if isinstance(sql_result, dict) else []
         candidate_fields: list[str] = []
@@ -980,10 +1095,7 @@ def execute_chat_workflow(
                     metric_text = str(metric).strip()
                     if not metric_text:
                         continue
-                    metric_fields = re.findall(
-                        r"\b([a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*)\b",
-                        metric_text,
-                    )
+                    metric_fields = _QUALIFIED_FIELD_RE.findall(metric_text)
                     for metric_field in metric_fields:
                         if metric_field in whitelist_set:
                             candidate_fields.append(metric_field)
@@ -1005,10 +1117,7 @@ def execute_chat_workflow(
         elif match_tick:
             missing_tokens.append(match_tick.group(1).strip())
         seen_missing_tokens = {item.lower() for item in missing_tokens}
-        extra_field_tokens = re.findall(
-            r"\b([a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*)\b",
-            error_text,
-        )
+        extra_field_tokens = _QUALIFIED_FIELD_RE.findall(error_text)
         for token in extra_field_tokens:
             token_text = token.strip()
             if not token_text:
@@ -1218,20 +1327,19 @@ def execute_chat_workflow(
                 "field_count": len(field_whitelist),
             },
         }
-        print("隐藏上下文探索节点输出:")
-        print(json.dumps(hc_result, indent=2, ensure_ascii=False, default=str))
+        _helper_debug_print("隐藏上下文探索节点输出:", hc_result)
         return hc_result
 
-    def _helper_insert_workflow_log(
+    def _helper_build_workflow_log(
             session_id: str,
             step_name: str,
             input_json: dict[str, Any],
             output_json: dict[str, Any] | None,
             status: str,
             error_message: str | None,
-    ) -> None:
-        """作用：插入工作流日志。
-        
+    ) -> dict[str, Any]:
+        """作用：构建工作流日志行字典，由调用方走 Core insert 统一批量入库。
+
         输入参数：
         - session_id: str。
         - step_name: str。
@@ -1239,68 +1347,64 @@ def execute_chat_workflow(
         - output_json: dict[str, Any] | None。
         - status: str。
         - error_message: str | None。
-        
+
         输出参数：
-        - 返回值类型: None。
+        - 返回值类型: dict[str, Any]。
         """
 
-        db.add(
-            WorkflowLog(
-                session_id=session_id,
-                step_name=step_name,
-                input_json=_helper_to_json_safe(input_json),
-                output_json=_helper_to_json_safe(output_json),
-                status=status,
-                error_message=error_message,
-                risk_level="low",
-                created_by=admin_id,
-                updated_by=admin_id,
-                is_deleted=False,
-            )
-        )
+        return {
+            "session_id": session_id,
+            "step_name": step_name,
+            "input_json": _helper_to_json_safe(input_json),
+            "output_json": _helper_to_json_safe(output_json),
+            "status": status,
+            "error_message": error_message,
+            "risk_level": "low",
+            "created_by": admin_id,
+            "updated_by": admin_id,
+            "is_deleted": False,
+        }
 
-    def _helper_insert_chat_history(
+    def _helper_build_chat_history_pair(
             session_id: str,
             user_message: str,
             assistant_message: str,
             model_name: str,
-    ) -> None:
-        """作用：插入一轮用户与助手会话。
-        
+    ) -> list[dict[str, Any]]:
+        """作用：构建一轮用户与助手会话的行字典，由调用方走 Core insert 统一批量入库。
+
         输入参数：
         - session_id: str。
         - user_message: str。
         - assistant_message: str。
         - model_name: str。
-        
+
         输出参数：
-        - 返回值类型: None。
+        - 返回值类型: list[dict[str, Any]]。
         """
 
-        db.add(
-            ChatHistory(
-                admin_id=admin_id,
-                session_id=session_id,
-                message_role="user",
-                message_content=user_message,
-                model_name=model_name,
-                created_by=admin_id,
-                updated_by=admin_id,
-                is_deleted=False,
-            )
-        )
-        db.add(
-            ChatHistory(
-                admin_id=admin_id,
-                session_id=session_id,
-                message_role="assistant",
-                message_content=assistant_message,
-                model_name=model_name,
-                created_by=admin_id,
-                updated_by=admin_id,
-                is_deleted=False,
-            )
-        )
+        return [
+            {
+                "admin_id": admin_id,
+                "session_id": session_id,
+                "message_role": "user",
+                "message_content": user_message,
+                "model_name": model_name,
+                "created_by": admin_id,
+                "updated_by": admin_id,
+                "is_deleted": False,
+            },
+            {
+                "admin_id": admin_id,
+                "session_id": session_id,
+                "message_role": "assistant",
+                "message_content": assistant_message,
+                "model_name": model_name,
+                "created_by": admin_id,
+                "updated_by": admin_id,
+                "is_deleted": False,
+            },
+        ]
 
     def _helper_save_node_io_local(
             session_id: str,
@@ -1339,9 +1443,13 @@ def execute_chat_workflow(
             "input": node_input,
             "output": node_output,
         }
-        file_path.write_text(
-            json.dumps(_helper_to_json_safe(payload_data), ensure_ascii=False, indent=2, default=str),
-            encoding="utf-8",
+        # orjson 直接产出 UTF-8 字节，序列化与落盘都比 stdlib 美化输出快一个量级。
+        file_path.write_bytes(
+            orjson.dumps(
+                _helper_to_json_safe(payload_data),
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            )
         )
 
     def _helper_node_logger(
@@ -1364,7 +1472,9 @@ def execute_chat_workflow(
         - 返回值类型: None。
         """
 
-        _helper_save_node_io_local(
+        # 提交给后台写手即返回，mkdir/write 的磁盘等待不再占用刚跑完 LLM 调用的请求线程。
+        _NODE_IO_LOG_EXECUTOR.submit(
+            _helper_save_node_io_local,
             session_id=session_id,
             step_name=step_name,
             node_input=node_input,
@@ -1373,14 +1483,14 @@ def execute_chat_workflow(
             error_message=error_message,
         )
 
-    def _helper_intent_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_intent_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的意图识别节点。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
 
         node_input = {
@@ -1389,6 +1499,7 @@ def execute_chat_workflow(
             "threshold": state["threshold"],
             "model_name": state["model_name"],
         }
+        executed_steps.add("intent_recognition")
         _helper_emit_step_event("intent_recognition", "start", None)
         try:
             intent_result = _helper_intent_node_logic(
@@ -1399,43 +1510,50 @@ def execute_chat_workflow(
             )
             _helper_node_logger("intent_recognition", node_input, intent_result, "success", None)
             _helper_emit_step_event("intent_recognition", "end", None)
-            return {**state, "intent_result": intent_result}
+            return {"intent_result": intent_result}
         except Exception as exc:
             _helper_node_logger("intent_recognition", node_input, None, "failed", str(exc))
             _helper_emit_step_event("intent_recognition", "error", str(exc))
             raise
 
-    def _helper_task_parse_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_task_parse_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的任务解析节点。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
 
         intent_result = state.get("intent_result") or {}
         node_input = {"intent_result": intent_result}
+        executed_steps.add("task_parse")
         _helper_emit_step_event("task_parse", "start", None)
         try:
-            parse_result = _helper_task_parse_node_logic(intent_result=intent_result, model_name=state["model_name"])
+            # KB 提示首次计算后写回状态，后续 SQL 生成（含重试）直接复用，不再重复获取。
+            kb_hints = state.get("kb_hints") or _helper_build_kb_hints()
+            parse_result = _helper_task_parse_node_logic(
+                intent_result=intent_result,
+                model_name=state["model_name"],
+                kb_hints=kb_hints,
+            )
             _helper_node_logger("task_parse", node_input, parse_result, "success", None)
             _helper_emit_step_event("task_parse", "end", None)
-            return {**state, "parse_result": parse_result}
+            return {"parse_result": parse_result, "kb_hints": kb_hints}
         except Exception as exc:
             _helper_node_logger("task_parse", node_input, None, "failed", str(exc))
             _helper_emit_step_event("task_parse", "error", str(exc))
             raise
 
-    def _helper_sql_generation_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_sql_generation_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的 SQL 生成节点。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
 
         parse_result = state.get("parse_result") or {}
@@ -1448,6 +1566,7 @@ def execute_chat_workflow(
             "hidden_context_result": hidden_context_result,
             "model_name": sql_generation_model_name,
         }
+        executed_steps.add("sql_generation")
         _helper_emit_step_event("sql_generation", "start", None)
         try:
             sql_result = _helper_sql_generation_node_logic(
@@ -1455,12 +1574,13 @@ def execute_chat_workflow(
                 parse_result=parse_result,
                 hidden_context_result=hidden_context_result,
                 model_name=sql_generation_model_name,
+                kb_hints=state.get("kb_hints") or _helper_build_kb_hints(),
             )
             _helper_node_logger("sql_generation", node_input, sql_result, "success", None)
             sql_preview = str(sql_result.get("sql") or "").strip()
             step_payload = {"sql": sql_preview} if sql_preview else None
             _helper_emit_step_event("sql_generation", "end", None, step_payload)
-            return {**state, "sql_result": sql_result}
+            return {"sql_result": sql_result}
         except Exception as exc:
             error_text = str(exc)
             fallback_sql_result = {
@@ -1483,41 +1603,41 @@ def execute_chat_workflow(
             # SQL 生成失败不再中断工作流，交由 hidden_context 继续修复。
             _helper_emit_step_event("sql_generation", "end", None)
             return {
-                **state,
                 "sql_result": fallback_sql_result,
                 "sql_validate_result": fallback_validate_result,
             }
 
-    def _helper_sql_validate_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_sql_validate_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的 SQL 验证节点。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
 
         node_input = {"sql_result": state.get("sql_result")}
+        executed_steps.add("sql_validate")
         _helper_emit_step_event("sql_validate", "start", None)
         try:
             validate_result = _helper_sql_validate_node_logic(sql_result=state.get("sql_result"))
             status = "success" if validate_result.get("is_valid") else "failed"
             _helper_node_logger("sql_validate", node_input, validate_result, status, validate_result.get("error"))
             _helper_emit_step_event("sql_validate", "end", None)
-            return {**state, "sql_validate_result": validate_result}
+            return {"sql_validate_result": validate_result}
         except Exception as exc:
             _helper_emit_step_event("sql_validate", "error", str(exc))
             raise
 
-    def _helper_hidden_context_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_hidden_context_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的 隐藏上下文 探索节点。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
 
         current_retry_count = int(state.get("hidden_context_retry_count") or 0)
@@ -1532,6 +1652,7 @@ def execute_chat_workflow(
             "sql_validate_result": sql_validate_result,
             "hidden_context_retry_count": current_retry_count,
         }
+        executed_steps.add("hidden_context")
         _helper_emit_step_event("hidden_context", "start", None)
         try:
             hidden_context_result = _helper_hidden_context_node_logic(
@@ -1543,29 +1664,32 @@ def execute_chat_workflow(
             next_retry_count = current_retry_count + 1
             hidden_context_result["retry_count"] = next_retry_count
             _helper_node_logger("hidden_context", node_input, hidden_context_result, "success", None)
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="hidden_context",
-                input_json=node_input,
-                output_json=hidden_context_result,
-                status="success",
-                error_message=None,
+            pending_workflow_rows.append(
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="hidden_context",
+                    input_json=node_input,
+                    output_json=hidden_context_result,
+                    status="success",
+                    error_message=None,
+                )
             )
             _helper_emit_step_event("hidden_context", "end", None)
             return {
-                **state,
                 "hidden_context_result": hidden_context_result,
                 "hidden_context_retry_count": next_retry_count,
             }
         except Exception as exc:
             _helper_node_logger("hidden_context", node_input, None, "failed", str(exc))
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="hidden_context",
-                input_json=node_input,
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
+            pending_workflow_rows.append(
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="hidden_context",
+                    input_json=node_input,
+                    output_json=None,
+                    status="failed",
+                    error_message=str(exc),
+                )
             )
             _helper_emit_step_event("hidden_context", "error", str(exc))
             raise
@@ -1762,7 +1886,7 @@ def execute_chat_workflow(
         if isinstance(sql_validate_result, dict):
             payload_rows = sql_validate_result.get("result")
             if isinstance(payload_rows, list) and payload_rows:
-                _, _, schema_hints = _helper_build_kb_hints()
+                _, _, schema_hints, _, _ = _helper_build_kb_hints()
                 field_display_hints = _helper_build_field_display_hints(payload_rows, schema_hints)
 
         final_status = "failed"
@@ -1917,18 +2041,17 @@ def execute_chat_workflow(
             "hidden_context_result": hidden_context_result,
             "hidden_context_retry_count": hidden_context_retry_count,
         }
-        print("结果返回节点输出：")
-        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        _helper_debug_print("结果返回节点输出：", result)
         return result
 
-    def _helper_result_return_node(state: UnifiedChatGraphState) -> UnifiedChatGraphState:
+    def _helper_result_return_node(state: UnifiedChatGraphState) -> dict[str, Any]:
         """作用：图中的结果返回节点，负责调用结果收敛逻辑并写回状态。
         
         输入参数：
         - state: UnifiedChatGraphState。
         
         输出参数：
-        - 返回值类型: UnifiedChatGraphState。
+        - 返回值类型: dict[str, Any]。增量状态，由 LangGraph 合并回完整状态。
         """
         node_input = {
             "message": state["message"],
@@ -1953,7 +2076,7 @@ def execute_chat_workflow(
             )
             _helper_node_logger("result_return", node_input, result_return_result, "success", None)
             _helper_emit_step_event("result_return", "end", None)
-            return {**state, "result_return_result": result_return_result}
+            return {"result_return_result": result_return_result}
         except Exception as exc:
             _helper_node_logger("result_return", node_input, None, "failed", str(exc))
             _helper_emit_step_event("result_return", "error", str(exc))
@@ -2078,13 +2201,14 @@ def execute_chat_workflow(
         raise RuntimeError("未配置 llm_model_intent，无法执行工作流")
 
     threshold = settings.intent_confidence_threshold
-    history_user_messages = _helper_get_recent_user_messages(session_id=session_id, limit=4)[-4:]
+    history_user_messages = _helper_get_recent_user_messages(session_id=session_id, limit=4)
 
     graph_state: UnifiedChatGraphState = {
         "message": payload.message,
         "history_user_messages": history_user_messages,
         "threshold": threshold,
         "model_name": model_name,
+        "kb_hints": None,
         "intent_result": None,
         "parse_result": None,
         "sql_result": None,
@@ -2111,92 +2235,89 @@ def execute_chat_workflow(
             raise ValueError("结果返回节点未产出有效结果")
         skipped = bool(result.get("skipped"))
 
-        _helper_insert_chat_history(
+        # 一轮会话的全部日志按表攒成行字典，收尾用 Core insert 各发一条 executemany，跳过 ORM 身份映射开销。
+        chat_rows = _helper_build_chat_history_pair(
             session_id=session_id,
             user_message=payload.message,
             assistant_message=str(result.get("assistant_reply") or result.get("summary") or ""),
             model_name=model_name,
         )
-        _helper_insert_workflow_log(
-            session_id=session_id,
-            step_name="intent_recognition",
-            input_json=input_json,
-            output_json=intent_result,
-            status="success",
-            error_message=None,
+        pending_workflow_rows.append(
+            _helper_build_workflow_log(
+                session_id=session_id,
+                step_name="intent_recognition",
+                input_json=input_json,
+                output_json=intent_result,
+                status="success",
+                error_message=None,
+            )
         )
         if not skipped:
             sql_generation_failed = bool((sql_result or {}).get("generation_failed"))
             sql_generation_error = str((sql_result or {}).get("generation_error") or "").strip() or None
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="task_parse",
-                input_json={"intent_result": intent_result},
-                output_json=parse_result,
-                status="success",
-                error_message=None,
+            pending_workflow_rows.append(
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="task_parse",
+                    input_json={"intent_result": intent_result},
+                    output_json=parse_result,
+                    status="success",
+                    error_message=None,
+                )
             )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="sql_generation",
-                input_json={"rewritten_query": result["rewritten_query"], "task": parse_result},
-                output_json=sql_result,
-                status="failed" if sql_generation_failed else "success",
-                error_message=sql_generation_error,
+            pending_workflow_rows.append(
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="sql_generation",
+                    input_json={"rewritten_query": result["rewritten_query"], "task": parse_result},
+                    output_json=sql_result,
+                    status="failed" if sql_generation_failed else "success",
+                    error_message=sql_generation_error,
+                )
             )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="sql_validate",
-                input_json={"sql_result": sql_result},
-                output_json=sql_validate_result,
-                status="success" if (sql_validate_result or {}).get("is_valid") else "failed",
-                error_message=(sql_validate_result or {}).get("error"),
+            pending_workflow_rows.append(
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="sql_validate",
+                    input_json={"sql_result": sql_result},
+                    output_json=sql_validate_result,
+                    status="success" if (sql_validate_result or {}).get("is_valid") else "failed",
+                    error_message=(sql_validate_result or {}).get("error"),
+                )
             )
+        db.execute(insert(ChatHistory), chat_rows)
+        db.execute(insert(WorkflowLog), pending_workflow_rows)
         db.commit()
         return result
     except Exception as exc:
         db.rollback()
         try:
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="intent_recognition",
-                input_json=input_json,
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
-            )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="task_parse",
-                input_json={"message": payload.message},
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
-            )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="sql_generation",
-                input_json={"message": payload.message},
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
-            )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="sql_validate",
-                input_json={"message": payload.message},
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
-            )
-            _helper_insert_workflow_log(
-                session_id=session_id,
-                step_name="hidden_context",
-                input_json={"message": payload.message},
-                output_json=None,
-                status="failed",
-                error_message=str(exc),
-            )
+            failure_rows = [
+                _helper_build_workflow_log(
+                    session_id=session_id,
+                    step_name="intent_recognition",
+                    input_json=input_json,
+                    output_json=None,
+                    status="failed",
+                    error_message=str(exc),
+                )
+            ]
+            # 只为真正执行过的节点补失败日志，未进入的节点不再产生虚假 failed 行。
+            for failed_step in ("task_parse", "sql_generation", "sql_validate", "hidden_context"):
+                if failed_step not in executed_steps:
+                    continue
+                failure_rows.append(
+                    _helper_build_workflow_log(
+                        session_id=session_id,
+                        step_name=failed_step,
+                        input_json={"message": payload.message},
+                        output_json=None,
+                        status="failed",
+                        error_message=str(exc),
+                    )
+                )
+            # rollback 不影响 Python 列表：图执行期间攒下的 hidden_context 日志随兜底行一并入库。
+            db.execute(insert(WorkflowLog), pending_workflow_rows + failure_rows)
             db.commit()
         except Exception:
             db.rollback()
@@ -21,6 +21,13 @@ STEP_DISPLAY_NAMES: dict[str, str] = {
     "result_return": "result_return",
 }
 
+# 占位文案导入时展平为 (step, status) -> str，回调里只剩一次字典查找。
+_STEP_MESSAGES: dict[tuple[str, str], str] = {
+    (step_name, status): text
+    for step_name, mapping in settings.chat_stream_step_message_placeholders.items()
+    for status, text in mapping.items()
+}
+
 WORKFLOW_ERROR_MESSAGE = "工作流执行失败，请稍后重试。"
 STEP_ERROR_MESSAGE_TEMPLATE = "{step}步骤执行异常，系统已终止本次处理。"
 SSE_HEARTBEAT_INTERVAL_SECONDS = 0.8
@@ -48,8 +55,10 @@ def generate_chat_stream(admin_id: int, payload: ChatIntentRequest) -> Iterator[
         输出参数：
         - str：占位文案。
         """
-        mapping = settings.chat_stream_step_message_placeholders.get(step_name, {})
-        return mapping.get(status, f"__STEP_{step_name.upper()}_{status.upper()}__")
+        message = _STEP_MESSAGES.get((step_name, status))
+        if message is None:
+            message = f"__STEP_{step_name.upper()}_{status.upper()}__"
+        return message
 
     def _helper_format_sse_chunk(event_name: str, event_payload: dict[str, Any]) -> str:
         """作用：把事件对象编码为 SSE 文本块。
@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from app.db.session import engine
+
+
+@lru_cache(maxsize=1)
+def get_inspector() -> sa.Inspector:
+    """
+    作用：返回进程内唯一的 Inspector。每次 sa.inspect(engine) 都会新建检查器并清空
+    info_cache，反射结果无法复用；单例让同进程内的所有反射调用共享缓存。
+    输出参数：
+    - Inspector: 绑定默认引擎的检查器单例。
+    """
+    return sa.inspect(engine)
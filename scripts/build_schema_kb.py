@@ -1,20 +1,51 @@
 import argparse
+import hashlib
 import json
 import os
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from app.db.base import Base
-import app.models  # noqa: F401
+_BASE = None
+
+
+def _get_base():
+    # 延迟导入：SQLAlchemy ORM + 全量模型包只在真正构建时才加载，
+    # 其他工具仅引用本模块的描述/别名字典时导入开销近乎为零。
+    global _BASE
+    if _BASE is None:
+        from app.db.base import Base
+
+        import app.models  # noqa: F401  导入副作用把全部表注册进 metadata
+
+        _BASE = Base
+    return _BASE
+
 
+# Bumped to 3.x for the columnar columns layout; also feeds source_signature
+# so a format change forces regeneration of an otherwise-unchanged KB.
+KB_VERSION = "3.0.0"
 
-CORE_TABLES = [
+# 顺序与成员判断分离：元组承载输出顺序，frozenset 提供 O(1) 查表。
+CORE_TABLES_ORDER: tuple[str, ...] = (
     "college",
     "major",
     "class",
@@ -25,10 +56,13 @@ CORE_TABLES = [
     "enroll",
     "score",
     "attendance",
-]
+)
+CORE_TABLES_SET = frozenset(CORE_TABLES_ORDER)
+# 兼容旧名：仍可按 CORE_TABLES 迭代。
+CORE_TABLES = CORE_TABLES_ORDER
 
 # Keep is_deleted for business filtering; remove only pure audit fields.
-AUDIT_FIELDS = {"created_at", "updated_at", "created_by", "updated_by"}
+AUDIT_FIELDS = frozenset({"created_at", "updated_at", "created_by", "updated_by"})
 
 
 TABLE_DESCRIPTIONS = {
@@ -45,7 +79,7 @@ TABLE_DESCRIPTIONS = {
 }
 
 
-FIELD_DESCRIPTIONS: dict[str, dict[str, str]] = {
+FIELD_DESCRIPTIONS = {
     "college": {
         "id": "学院唯一标识。",
         "college_name": "学院名称，学院实体映射主字段。",
@@ -152,7 +186,7 @@ FIELD_DESCRIPTIONS: dict[str, dict[str, str]] = {
     },
 }
 
-COMMON_FIELD_ALIASES: dict[str, list[str]] = {
+COMMON_FIELD_ALIASES = {
     "id": ["主键", "ID", "唯一标识"],
     "description": ["说明", "备注", "简介"],
     "is_deleted": ["删除标记", "逻辑删除", "删除状态"],
@@ -167,7 +201,7 @@ COMMON_FIELD_ALIASES: dict[str, list[str]] = {
     "title": ["职称"],
 }
 
-TABLE_FIELD_ALIASES: dict[str, dict[str, list[str]]] = {
+TABLE_FIELD_ALIASES = {
     "college": {
         "college_name": ["学院名", "院系名称", "院系"],
         "college_code": ["学院编号", "院系编码", "院系编号"],
@@ -238,6 +272,51 @@ TABLE_FIELD_ALIASES: dict[str, dict[str, list[str]]] = {
     },
 }
 
+# Freeze the lookup tables: tuples are smaller than lists, read-only proxies
+# rule out accidental mutation by importers, and interning collapses alias
+# strings repeated across tables into single heap objects.
+TABLE_DESCRIPTIONS: Mapping[str, str] = MappingProxyType(
+    {sys.intern(k): v for k, v in TABLE_DESCRIPTIONS.items()}
+)
+FIELD_DESCRIPTIONS: Mapping[str, Mapping[str, str]] = MappingProxyType(
+    {
+        sys.intern(t): MappingProxyType({sys.intern(k): v for k, v in fields.items()})
+        for t, fields in FIELD_DESCRIPTIONS.items()
+    }
+)
+COMMON_FIELD_ALIASES: Mapping[str, tuple[str, ...]] = MappingProxyType(
+    {sys.intern(k): tuple(sys.intern(v) for v in vs) for k, vs in COMMON_FIELD_ALIASES.items()}
+)
+TABLE_FIELD_ALIASES: Mapping[str, Mapping[str, tuple[str, ...]]] = MappingProxyType(
+    {
+        sys.intern(t): MappingProxyType(
+            {sys.intern(k): tuple(sys.intern(v) for v in vs) for k, vs in fields.items()}
+        )
+        for t, fields in TABLE_FIELD_ALIASES.items()
+    }
+)
+
+
+def _merge_aliases() -> Mapping[tuple[str, str], tuple[str, ...]]:
+    # 导入时把公共别名与表级别名合并去重成 (表, 字段) -> 元组的平面字典，
+    # 之后的别名查找都是一次哈希命中，不再做两次嵌套 get 加拼接。
+    merged: dict[tuple[str, str], tuple[str, ...]] = {}
+    for table_name in CORE_TABLES_ORDER:
+        taliases = TABLE_FIELD_ALIASES.get(table_name, {})
+        for field_name in chain(COMMON_FIELD_ALIASES, taliases):
+            key = (table_name, field_name)
+            if key in merged:
+                continue
+            seen: dict[str, None] = {}
+            for v in chain(COMMON_FIELD_ALIASES.get(field_name, ()), taliases.get(field_name, ())):
+                if v and (v := v.strip()):
+                    seen[v] = None
+            merged[key] = tuple(seen)
+    return MappingProxyType(merged)
+
+
+MERGED_ALIASES: Mapping[tuple[str, str], tuple[str, ...]] = _merge_aliases()
+
 
 def table_description(table_name: str) -> str:
     return TABLE_DESCRIPTIONS.get(table_name, f"{table_name} 核心业务表。")
@@ -248,68 +327,123 @@ def field_description(table_name: str, field_name: str) -> str:
 
 
 def field_aliases(table_name: str, field_name: str) -> list[str]:
-    values: list[str] = []
-    values.extend(COMMON_FIELD_ALIASES.get(field_name, []))
-    values.extend(TABLE_FIELD_ALIASES.get(table_name, {}).get(field_name, []))
-    # Deduplicate while preserving order.
-    return list(dict.fromkeys([v.strip() for v in values if v and v.strip()]))
-
-
-def build_tables(meta_tables: dict[str, Any]) -> list[dict[str, Any]]:
-    items: list[dict[str, Any]] = []
-    for table_name in CORE_TABLES:
-        table = meta_tables[table_name]
-        columns = []
-        for col in table.columns:
-            if col.name in AUDIT_FIELDS:
-                continue
-            columns.append(
-                {
-                    "name": col.name,
-                    "description": field_description(table_name, col.name),
-                    "aliases": field_aliases(table_name, col.name),
-                }
-            )
-        items.append(
-            {
-                "name": table_name,
-                "description": table_description(table_name),
-                "columns": columns,
-            }
+    hit = MERGED_ALIASES.get((table_name, field_name))
+    if hit is None:
+        # 非核心表或未登记组合：回退公共别名，保持旧行为。
+        hit = COMMON_FIELD_ALIASES.get(field_name, ())
+    return list(hit)
+
+
+def _build_table(table_name: str, col_names: tuple[str, ...]) -> dict[str, Any]:
+    # Bind the per-table description dict once; the column loop then does
+    # one hash lookup per value (descriptions and pre-merged aliases alike).
+    fdesc = FIELD_DESCRIPTIONS.get(table_name, {})
+    # 校验在构建时同步完成，不再对产物做第二遍遍历。
+    description = table_description(table_name)
+    if not description:
+        raise RuntimeError(f"表描述为空：{table_name}")
+    columns = []
+    for name in col_names:
+        desc = fdesc.get(name) or f"{name} 字段。"
+        if not desc:
+            raise RuntimeError(f"字段描述为空：{table_name}.{name}")
+        columns.append([name, desc, list(MERGED_ALIASES.get((table_name, name), ()))])
+    return {
+        "name": table_name,
+        "description": description,
+        # JSON-Tables 列式布局：列名只写一次，行数据为定长数组，
+        # 文件更小、下游解析分配的 dict 也更少。
+        "columns": {
+            "__dict_type": "table",
+            "cols": ["name", "description", "aliases"],
+            "row_data": columns,
+        },
+    }
+
+
+def build_tables(snapshot: Mapping[str, tuple[str, ...]], parallel: bool = False) -> list[dict[str, Any]]:
+    if parallel:
+        # 各表之间互不依赖；map 保序，所以输出顺序仍与 CORE_TABLES_ORDER 一致。
+        # 纯字典查找受 GIL 约束，只有描述/别名规模显著增长后才值得开启。
+        with ThreadPoolExecutor(max_workers=min(len(CORE_TABLES_ORDER), os.cpu_count() or 4)) as ex:
+            return list(ex.map(lambda name: _build_table(name, snapshot[name]), CORE_TABLES_ORDER))
+    return [_build_table(name, snapshot[name]) for name in CORE_TABLES_ORDER]
+
+
+def to_records(columns: Any) -> list[dict[str, Any]]:
+    # 兼容旧消费方：把列式 columns 还原成 [{name, description, aliases}, ...]。
+    if isinstance(columns, dict):
+        cols = columns.get("cols") or []
+        return [dict(zip(cols, row)) for row in columns.get("row_data") or []]
+    return list(columns or [])
+
+
+def source_mtime() -> float:
+    # 时间戳取自输入文件（本脚本 + 模型包）的最新修改时间而非墙钟：
+    # 输入不变则输出字节不变，内容签名缓存与下游 ETag 缓存都能命中。
+    import app.models
+
+    models_dir = Path(app.models.__file__).parent
+    return max(os.path.getmtime(p) for p in chain([__file__], models_dir.glob("*.py")))
+
+
+def source_signature() -> str:
+    # Stable digest over every input that shapes the output: table list, all
+    # description/alias dicts, and the model columns. Unchanged sig == unchanged KB.
+    payload = repr(
+        (
+            KB_VERSION,
+            CORE_TABLES_ORDER,
+            sorted(TABLE_DESCRIPTIONS.items()),
+            sorted(FIELD_DESCRIPTIONS.items()),
+            sorted(COMMON_FIELD_ALIASES.items()),
+            sorted(TABLE_FIELD_ALIASES.items()),
+            tuple((t.name, tuple(c.name for c in t.columns)) for t in _get_base().metadata.sorted_tables),
         )
-    return items
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# 按表缓存过滤后的列名元组：同一进程内重复 build_kb() 不再重扫 SQLAlchemy 元数据。
+_NON_AUDIT_COLUMNS_CACHE: dict[str, tuple[str, ...]] = {}
 
 
-def build_kb() -> dict[str, Any]:
-    meta_tables = Base.metadata.tables
-    missing = [name for name in CORE_TABLES if name not in meta_tables]
+def _get_cols(table_name: str) -> tuple[str, ...]:
+    cols = _NON_AUDIT_COLUMNS_CACHE.get(table_name)
+    if cols is None:
+        table = _get_base().metadata.tables[table_name]
+        cols = tuple(c.name for c in table.columns if c.name not in AUDIT_FIELDS)
+        _NON_AUDIT_COLUMNS_CACHE[table_name] = cols
+    return cols
+
+
+def build_kb(parallel: bool = False) -> dict[str, Any]:
+    meta_tables = _get_base().metadata.tables
+    missing = [name for name in CORE_TABLES_ORDER if name not in meta_tables]
     if missing:
         raise RuntimeError(f"核心表缺失：{missing}")
 
+    # 快照只含纯字符串元组：构建循环不再触碰 Column 对象，也没有审计字段分支。
+    snapshot = {name: _get_cols(name) for name in CORE_TABLES_ORDER}
+    tables = build_tables(snapshot, parallel=parallel)
+    if not tables:
+        raise RuntimeError("知识库缺少 tables。")
+
     return {
         "meta": {
             "name": "edu_schema_kb_core",
-            "version": "2.1.0",
-            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "version": KB_VERSION,
+            "generated_at": datetime.fromtimestamp(int(source_mtime()), tz=timezone.utc).isoformat(
+                timespec="seconds"
+            ),
             "scope": "core_table_and_field_descriptions_only",
             "note": "仅保留核心表与字段描述，保留 is_deleted 供逻辑删除过滤使用。",
+            "source_sig": source_signature(),
         },
-        "tables": build_tables(meta_tables),
+        "tables": tables,
     }
 
 
-def validate_kb(kb: dict[str, Any]) -> None:
-    tables = kb.get("tables", [])
-    if not tables:
-        raise RuntimeError("知识库缺少 tables。")
-    for table in tables:
-        if not table.get("description"):
-            raise RuntimeError(f"表描述为空：{table.get('name')}")
-        for col in table.get("columns", []):
-            if not col.get("description"):
-                raise RuntimeError(f"字段描述为空：{table.get('name')}.{col.get('name')}")
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="生成核心表与字段描述知识库")
     parser.add_argument(
@@ -317,14 +451,50 @@ def main() -> None:
         default="app/knowledge/schema_kb_core.json",
         help="输出文件路径（默认 app/knowledge/schema_kb_core.json）",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="按表并行构建（表多或描述量大时使用）",
+    )
     args = parser.parse_args()
 
-    kb = build_kb()
-    validate_kb(kb)
-
     out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(kb, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Skip regeneration when the existing file was built from identical inputs.
+    sig = source_signature()
+    if out_path.exists():
+        try:
+            existing_sig = json.loads(out_path.read_text(encoding="utf-8"))["meta"].get("source_sig")
+        except (OSError, ValueError, KeyError):
+            existing_sig = None
+        if existing_sig == sig:
+            print(f"Schema KB unchanged: {out_path}")
+            return
+
+    kb = build_kb(parallel=args.parallel)
+
+    # 输出目录通常已存在：先用 stat 探测，重复构建时省掉无谓的 mkdir 系统调用。
+    parent = out_path.parent
+    if not parent.exists():
+        parent.mkdir(parents=True, exist_ok=True)
+    # orjson emits UTF-8 bytes in one shot (no per-char escaping of Chinese text);
+    # fall back to the stdlib encoder when it is not installed.
+    if orjson is not None:
+        payload = orjson.dumps(kb, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(kb, ensure_ascii=False, indent=2).encode("utf-8")
+    # 先写同目录临时文件再 os.replace 原子替换，正在读 KB 的服务不会看到半截 JSON。
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, out_path)
+
+    # 可选的 msgpack 兄弟产物：二进制编码更小、C 解析器加载更快，
+    # 下游可优先探测 .msgpack；未安装 msgpack 时只输出 JSON。
+    if msgpack is not None:
+        mp_path = out_path.with_suffix(".msgpack")
+        mp_tmp = mp_path.with_suffix(mp_path.suffix + ".tmp")
+        mp_tmp.write_bytes(msgpack.packb(kb, use_bin_type=True))
+        os.replace(mp_tmp, mp_path)
+        print(f"Schema KB msgpack generated: {mp_path}")
     print(f"Schema KB generated: {out_path}")
     print(f"tables={len(kb['tables'])}")
 
@@ -1,36 +1,27 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
 from app.db.base import Base
 from app.db.session import engine
-from app.models import (
-    Admin,
-    AlertEvent,
-    AlertRule,
-    Attendance,
-    AuditLog,
-    ChatHistory,
-    ClassModel,
-    Classroom,
-    College,
-    Course,
-    CourseClass,
-    Enroll,
-    ImportLog,
-    Major,
-    MetricDef,
-    MetricSnapshot,
-    QueryTemplate,
-    Score,
-    SqlLog,
-    StrategyPolicy,
-    Student,
-    SystemConfig,
-    Teacher,
-    WorkflowLog,
-)
+from scripts._reflection import get_inspector
+
+import app.models  # noqa: F401  导入副作用注册全部模型，新增表自动纳入 DDL
 
 
 def main() -> None:
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created.")
+    # 一次批量探测已建表，替代 create_all 默认 checkfirst 的逐表 SELECT 轮询；
+    # 幂等重跑时不再发出任何 DDL。
+    existing = set(get_inspector().get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+    if missing:
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+        print(f"Database tables created: {len(missing)}")
+    else:
+        print("Database tables already exist.")
 
 
 if __name__ == "__main__":